@@ -1,5 +1,6 @@
 from .models import User as User
 from .router import auth_router as auth_router
 from .utils import current_user as current_user
+from .utils import invalidate_user as invalidate_user
 
-__all__ = ["auth_router", "current_user", "User"]
+__all__ = ["auth_router", "current_user", "invalidate_user", "User"]
@@ -0,0 +1,115 @@
+import asyncio
+import logging
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Optional
+
+from fastapi import HTTPException
+
+from ..config import global_config
+
+logger = logging.getLogger(__name__)
+
+
+# bcrypt is imported on first use to keep it out of startup.
+def _hashpw(raw_password: bytes) -> bytes:
+    import bcrypt
+
+    return bcrypt.hashpw(raw_password, salt=bcrypt.gensalt())
+
+
+def _checkpw(plain_password: bytes, hashed_password: bytes) -> bool:
+    import bcrypt
+
+    return bcrypt.checkpw(plain_password, hashed_password)
+
+
+def _timed_call(func: Callable, submitted_at: float, *args):
+    # Runs inside the worker; wall clock so it is comparable across processes.
+    waited = time.time() - submitted_at
+    return func(*args), waited
+
+
+class HashingPool:
+    """
+    Runs bcrypt hashing and verification outside the event loop.
+    - `kind` is "thread" or "process"; bcrypt releases the GIL so threads scale.
+    - At most `workers + max_queue` jobs are accepted, the rest get a 503.
+    - `stats()` reports queue depth and the time jobs waited for a worker.
+    """
+
+    def __init__(self, kind: str = "thread", workers: int = 4, max_queue: int = 64):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Unknown hashing pool kind: {kind}")
+        self.kind = kind
+        self.workers = workers
+        self.max_queue = max_queue
+        self._executor: Optional[Executor] = None
+        self._pending = 0
+        self._rejected = 0
+        self._completed = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.kind == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix="bcrypt"
+                )
+        return self._executor
+
+    async def _submit(self, func: Callable, *args):
+        if self._pending >= self.workers + self.max_queue:
+            self._rejected += 1
+            raise HTTPException(503, "Server busy, try again", {"Retry-After": "1"})
+        self._pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            result, waited = await loop.run_in_executor(
+                self._get_executor(), _timed_call, func, time.time(), *args
+            )
+        finally:
+            self._pending -= 1
+        self._completed += 1
+        self._wait_total += waited
+        self._wait_max = max(self._wait_max, waited)
+        return result
+
+    async def hash(self, raw_password: str) -> bytes:
+        return await self._submit(_hashpw, raw_password.encode())
+
+    async def verify(self, plain_password: str, hashed_password: bytes) -> bool:
+        if isinstance(hashed_password, str):
+            hashed_password = hashed_password.encode()
+        return await self._submit(_checkpw, plain_password.encode(), hashed_password)
+
+    def stats(self) -> dict:
+        return {
+            "kind": self.kind,
+            "workers": self.workers,
+            "max_queue": self.max_queue,
+            "in_flight": self._pending,
+            "queue_depth": max(0, self._pending - self.workers),
+            "completed": self._completed,
+            "rejected": self._rejected,
+            "wait_seconds_total": self._wait_total,
+            "wait_seconds_max": self._wait_max,
+            "wait_seconds_avg": (
+                self._wait_total / self._completed if self._completed else 0.0
+            ),
+        }
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+
+hashing_pool = HashingPool(
+    kind=global_config.HASH_POOL_KIND,
+    workers=global_config.HASH_POOL_WORKERS,
+    max_queue=global_config.HASH_POOL_MAX_QUEUE,
+)
@@ -0,0 +1,72 @@
+import asyncio
+import logging
+from datetime import datetime, timezone
+
+from sqlalchemy import case, update
+
+from ..config import global_config
+from ..config.db import async_session
+from .models import User
+
+logger = logging.getLogger(__name__)
+
+
+class LastLoginBuffer:
+    """
+    Collects login times in memory and writes them as one UPDATE per flush.
+    - Only the latest login per user is kept, so the buffer holds one entry per user.
+    - Flushes every `flush_interval` seconds, or as soon as `max_size` users wait.
+    - A failed flush puts its entries back for the next one.
+    """
+
+    def __init__(self, flush_interval: float = 5, max_size: int = 1000):
+        self.flush_interval = flush_interval
+        self.max_size = max_size
+        self._pending: dict[int, datetime] = {}
+        self._full = asyncio.Event()
+
+    def record(self, user_id: int):
+        self._pending[user_id] = datetime.now(timezone.utc).replace(tzinfo=None)
+        if len(self._pending) >= self.max_size:
+            self._full.set()
+
+    async def flush(self) -> int:
+        if not self._pending:
+            return 0
+        batch, self._pending = self._pending, {}
+        self._full.clear()
+        try:
+            async with async_session() as session:
+                await session.execute(
+                    update(User)
+                    .where(User.id.in_(batch))
+                    .values(last_login=case(batch, value=User.id))
+                    .execution_options(synchronize_session=False)
+                )
+                await session.commit()
+        except Exception as exc:
+            logger.error("Flushing %d last logins failed: %s", len(batch), exc)
+            for user_id, logged_in in batch.items():
+                self._pending.setdefault(user_id, logged_in)
+            return 0
+        return len(batch)
+
+    async def run(self, stop: asyncio.Event):
+        while not stop.is_set():
+            wake = asyncio.create_task(self._full.wait())
+            halt = asyncio.create_task(stop.wait())
+            await asyncio.wait(
+                (wake, halt),
+                timeout=self.flush_interval,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            wake.cancel()
+            halt.cancel()
+            await self.flush()
+        await self.flush()
+
+
+last_login_buffer = LastLoginBuffer(
+    flush_interval=global_config.LAST_LOGIN_FLUSH_INTERVAL,
+    max_size=global_config.LAST_LOGIN_BUFFER_SIZE,
+)
@@ -1,8 +1,8 @@
-import bcrypt
-from sqlalchemy import Boolean, Column, DateTime, Integer, String, func
+from sqlalchemy import Boolean, Column, DateTime, Float, Index, Integer, String, func
 from sqlalchemy.orm import relationship
 
 from ..config import Base
+from .hashing import hashing_pool
 
 
 class User(Base):
@@ -29,8 +29,29 @@ class User(Base):
     posts = relationship("Post", back_populates="author")
     drafts = relationship("Draft", back_populates="author")
 
-    def hash(self, raw_password: str):
-        self.password = bcrypt.hashpw(raw_password.encode(), salt=bcrypt.gensalt())
+    async def hash(self, raw_password: str):
+        self.password = await hashing_pool.hash(raw_password)
 
-    def verify(self, plain_password: str):
-        return bcrypt.checkpw(plain_password.encode(), self.password)
+    async def verify(self, plain_password: str):
+        return await hashing_pool.verify(plain_password, self.password)
+
+
+class TokenRevocation(Base):
+    """
+    Model to store revoked tokens, loaded into memory by every worker.
+    - A row with `jti` revokes that single token (logout, rotated refresh token).
+    - A row with `issued_before` revokes every token of `user_id` issued
+      before that epoch time (password reset, logout everywhere).
+    - Rows are deleted once `expires_at` passes, as the tokens they revoke
+      have expired by then, which keeps the table small.
+    """
+
+    __tablename__ = "token_revocations"
+
+    id = Column(Integer, primary_key=True)
+    jti = Column(String(32), nullable=True)
+    user_id = Column(Integer, nullable=False)
+    issued_before = Column(Float, nullable=True)
+    expires_at = Column(Float, nullable=False)
+
+    __table_args__ = (Index("ix_token_revocations_expires_at", "expires_at"),)
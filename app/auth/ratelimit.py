@@ -0,0 +1,55 @@
+import math
+
+from fastapi import Depends, HTTPException, Query, Request
+from fastapi.security import OAuth2PasswordRequestForm
+
+from ..common import RateLimiter
+from ..config import global_config
+
+
+def _limiter(limit: int, period: float) -> RateLimiter:
+    return RateLimiter(
+        limit,
+        period,
+        shards=global_config.RATE_LIMIT_SHARDS,
+        max_keys=global_config.RATE_LIMIT_MAX_KEYS,
+        enabled=global_config.RATE_LIMIT_ENABLED,
+    )
+
+
+login_ip_limiter = _limiter(global_config.LOGIN_LIMIT_PER_IP, 60)
+login_user_limiter = _limiter(global_config.LOGIN_LIMIT_PER_USER, 60)
+forgot_ip_limiter = _limiter(global_config.PASSWORD_FORGOT_LIMIT_PER_IP, 3600)
+forgot_email_limiter = _limiter(global_config.PASSWORD_FORGOT_LIMIT_PER_EMAIL, 3600)
+
+limiters = {
+    "login_ip": login_ip_limiter,
+    "login_user": login_user_limiter,
+    "password_forgot_ip": forgot_ip_limiter,
+    "password_forgot_email": forgot_email_limiter,
+}
+
+
+def client_ip(request: Request) -> str:
+    # Behind a proxy, run uvicorn with --proxy-headers so this is the real client.
+    return request.client.host if request.client else "unknown"
+
+
+def check(limiter: RateLimiter, key: str):
+    wait = limiter.hit(key)
+    if wait:
+        raise HTTPException(
+            429, "Too many requests", {"Retry-After": str(math.ceil(wait))}
+        )
+
+
+async def limit_login(
+    request: Request, form_data: OAuth2PasswordRequestForm = Depends()
+):
+    check(login_ip_limiter, client_ip(request))
+    check(login_user_limiter, form_data.username.lower())
+
+
+async def limit_password_forgot(request: Request, email: str = Query(...)):
+    check(forgot_ip_limiter, client_ip(request))
+    check(forgot_email_limiter, email.lower())
@@ -0,0 +1,110 @@
+import asyncio
+import logging
+import time
+from typing import Optional
+
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..config import global_config
+from ..config.db import async_session
+from .models import TokenRevocation
+
+logger = logging.getLogger(__name__)
+SYNC_OVERLAP = 100
+
+
+class RevocationStore:
+    """
+    In-memory copy of `token_revocations`, checked on every authenticated request.
+    - `is_revoked` is two dict lookups and never touches the database.
+    - Revocations made by other workers arrive within `sync_interval` seconds;
+      each sync only reads rows newer than the last one seen.
+    - Entries are dropped once the tokens they revoke have expired.
+    """
+
+    def __init__(self, sync_interval: float = 5):
+        self.sync_interval = sync_interval
+        self._tokens: dict[str, float] = {}
+        self._cutoffs: dict[int, tuple[float, float]] = {}
+        self._last_id = 0
+
+    def is_revoked(self, jti: Optional[str], user_id: int, issued_at: float) -> bool:
+        if jti is not None and jti in self._tokens:
+            return True
+        cutoff = self._cutoffs.get(user_id)
+        return cutoff is not None and issued_at < cutoff[0]
+
+    def is_revoked_token(self, jti: Optional[str]) -> bool:
+        return jti is not None and jti in self._tokens
+
+    def _apply(self, row: TokenRevocation):
+        if row.jti is not None:
+            self._tokens[row.jti] = row.expires_at
+        if row.issued_before is not None:
+            current = self._cutoffs.get(row.user_id)
+            if current is None or current[0] < row.issued_before:
+                self._cutoffs[row.user_id] = (row.issued_before, row.expires_at)
+
+    def _prune(self, now: float):
+        self._tokens = {
+            jti: expires for jti, expires in self._tokens.items() if expires > now
+        }
+        self._cutoffs = {
+            user_id: cutoff
+            for user_id, cutoff in self._cutoffs.items()
+            if cutoff[1] > now
+        }
+
+    def revoke_token(
+        self, db: AsyncSession, jti: Optional[str], user_id: int, expires_at: float
+    ):
+        """Revoke one token; other workers see it once the caller commits."""
+        if jti is None:
+            return
+        row = TokenRevocation(jti=jti, user_id=user_id, expires_at=expires_at)
+        db.add(row)
+        self._apply(row)
+
+    def revoke_user(self, db: AsyncSession, user_id: int):
+        """Revoke every token issued to the user until now."""
+        now = time.time()
+        lifetime = global_config.REFRESH_TOKEN_MINUTES * 60
+        row = TokenRevocation(
+            user_id=user_id, issued_before=now, expires_at=now + lifetime
+        )
+        db.add(row)
+        self._apply(row)
+
+    async def sync(self):
+        async with async_session() as session:
+            # Ids can commit out of order, so recent ones are read again.
+            result = await session.execute(
+                select(TokenRevocation)
+                .where(TokenRevocation.id > self._last_id - SYNC_OVERLAP)
+                .order_by(TokenRevocation.id)
+            )
+            for row in result.scalars():
+                self._apply(row)
+                self._last_id = max(self._last_id, row.id)
+            now = time.time()
+            await session.execute(
+                delete(TokenRevocation).where(TokenRevocation.expires_at < now)
+            )
+            await session.commit()
+        self._prune(now)
+
+    async def run(self, stop: asyncio.Event):
+        while True:
+            try:
+                await asyncio.wait_for(stop.wait(), self.sync_interval)
+                return
+            except asyncio.TimeoutError:
+                pass
+            try:
+                await self.sync()
+            except Exception as exc:
+                logger.error("Token revocation sync failed: %s", exc)
+
+
+revocations = RevocationStore(sync_interval=global_config.REVOCATION_SYNC_INTERVAL)
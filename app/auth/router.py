@@ -2,7 +2,6 @@ import logging
 
 from fastapi import (
     APIRouter,
-    BackgroundTasks,
     Body,
     Depends,
     HTTPException,
@@ -10,39 +9,60 @@ from fastapi import (
     Query,
 )
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy import func
+from sqlalchemy import insert, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.sql import select
 
-from ..config import get_db
+from ..common import model_response
+from ..config import get_db, global_config
 from . import schemas
+from .hashing import hashing_pool
+from .last_login import last_login_buffer
 from .models import User
-from .utils import JWTRepo, send_forgot_password_email, send_user_confirm_email
+from .ratelimit import limit_login, limit_password_forgot
+from .revocation import revocations
+from .utils import (
+    JWTRepo,
+    current_user,
+    invalidate_user,
+    load_auth_user,
+    oauth2_scheme,
+    queue_forgot_password_email,
+    queue_user_confirm_email,
+)
 
 auth_router = APIRouter(prefix="/user", tags=["Authorization"])
 logger = logging.getLogger(__name__)
 
 
 @auth_router.post("/register/", response_model=schemas.UserResponse, status_code=201)
-async def register_user(
-    bg_task: BackgroundTasks, user: schemas.UserBase, db: AsyncSession = Depends(get_db)
-):
+async def register_user(user: schemas.UserBase, db: AsyncSession = Depends(get_db)):
     logger.debug("New user registration started")
     try:
-        user_obj = User(**user.model_dump())
-        user_obj.hash(user.password)
-        db.add(user_obj)
+        password = await hashing_pool.hash(user.password)
+        user_obj = await db.scalar(
+            insert(User)
+            .values(**user.model_dump(exclude={"password"}), password=password)
+            .returning(User)
+        )
+        queue_user_confirm_email(db, user_obj)
         await db.commit()
-        await db.refresh(user_obj)
         logger.debug("New user registration completed")
-        bg_task.add_task(send_user_confirm_email, user_obj)
-        return user_obj
+        return model_response(schemas.UserResponse, user_obj, status_code=201)
+    except HTTPException:
+        await db.rollback()
+        raise
     except Exception as exc:
         await db.rollback()
         raise HTTPException(400, "An error occurred during user registration") from exc
 
 
-@auth_router.post("/login/", response_model=schemas.LoginResponse, status_code=200)
+@auth_router.post(
+    "/login/",
+    response_model=schemas.LoginResponse,
+    status_code=200,
+    dependencies=[Depends(limit_login)],
+)
 async def login_user(
     form_data: OAuth2PasswordRequestForm = Depends(),
     db: AsyncSession = Depends(get_db),
@@ -51,23 +71,26 @@ async def login_user(
         logger.debug("User login started")
         result = await db.execute(select(User).filter_by(username=form_data.username))
         user = result.scalar_one_or_none()
-        if user is None or not user.verify(form_data.password):
+        if user is None or not await user.verify(form_data.password):
             raise HTTPException(401, "Invalid credentials")
         if not user.is_active:
             raise HTTPException(403, "Inactive user")
         if not user.is_confirmed:
             raise HTTPException(403, "Activate account by confirming email")
-        user.last_login = func.now()
-        await db.commit()
-        await db.refresh(user)
+        last_login_buffer.record(user.id)
         access_token = JWTRepo.create_token(user.id, "access")
-        refresh_token = JWTRepo.create_token(user.id, "refresh", 1440)
+        refresh_token = JWTRepo.create_token(
+            user.id, "refresh", global_config.REFRESH_TOKEN_MINUTES
+        )
         logger.debug("User login completed")
         return {
             "token_type": "Bearer",
             "access_token": access_token,
             "refresh_token": refresh_token,
         }
+    except HTTPException:
+        await db.rollback()
+        raise
     except Exception as exc:
         await db.rollback()
         raise HTTPException(400, "An error occurred during login") from exc
@@ -78,14 +101,18 @@ async def confirm_user_email(
     token: str = Path(...), db: AsyncSession = Depends(get_db)
 ):
     try:
-        user_id = JWTRepo.decode_token(token, "confirm")
-        result = await db.execute(select(User).filter_by(id=user_id))
-        user = result.scalar_one_or_none()
-        if user is None or not user.is_active:
+        user_id = int(JWTRepo.decode_token(token, "confirm"))
+        confirmed = await db.scalar(
+            update(User)
+            .where(User.id == user_id, User.is_active.is_(True))
+            .values(is_confirmed=True)
+            .returning(User.id)
+            .execution_options(synchronize_session=False)
+        )
+        if confirmed is None:
             raise HTTPException(403, "Invalid user")
-        user.is_confirmed = True
         await db.commit()
-        await db.refresh(user)
+        invalidate_user(user_id)
         return {"message": "Success"}
     except Exception as exc:
         raise HTTPException(400, "User confirmation failed") from exc
@@ -99,50 +126,105 @@ async def refresh_token(
 ):
     try:
         logger.debug("User token refresh started")
-        user_id = JWTRepo.decode_token(data.refresh_token, "refresh")
-        result = await db.execute(select(User).filter_by(id=user_id))
-        auth_user = result.scalar_one_or_none()
-        if auth_user is None:
-            raise HTTPException(401, "Invalid user")
-        access_token = JWTRepo.create_token(auth_user.id, "access")
+        claims = JWTRepo.decode_claims(data.refresh_token, "refresh")
+        user_id, jti = int(claims["sub"]), claims.get("jti")
+        if revocations.is_revoked_token(jti):
+            # A rotated refresh token came back, so it was copied: end every session.
+            revocations.revoke_user(db, user_id)
+            await db.commit()
+            logger.warning("Refresh token reused for user %s", user_id)
+            raise HTTPException(401, "Token has been revoked")
+        if revocations.is_revoked(jti, user_id, claims.get("iat", 0)):
+            raise HTTPException(401, "Token has been revoked")
+        auth_user = await load_auth_user(user_id, db)
+        if not auth_user.is_active:
+            raise HTTPException(403, "Inactive user")
+        revocations.revoke_token(db, jti, user_id, claims["exp"])
+        await db.commit()
+        access_token = JWTRepo.create_token(user_id, "access")
+        new_refresh_token = JWTRepo.create_token(
+            user_id, "refresh", global_config.REFRESH_TOKEN_MINUTES
+        )
         logger.debug("User token refresh completed")
-        return {"token_type": "Bearer", "access_token": access_token}
+        return {
+            "token_type": "Bearer",
+            "access_token": access_token,
+            "refresh_token": new_refresh_token,
+        }
+    except HTTPException:
+        await db.rollback()
+        raise
     except Exception as exc:
+        await db.rollback()
         raise HTTPException(400, "An error occurred during token refresh") from exc
 
 
+@auth_router.post("/logout/", response_model=schemas.Success, status_code=200)
+async def logout_user(
+    data: schemas.LogoutInput = Body(schemas.LogoutInput()),
+    token: str = Depends(oauth2_scheme),
+    user: schemas.AuthUser = Depends(current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    if data.everywhere:
+        revocations.revoke_user(db, user.id)
+    else:
+        claims = JWTRepo.decode_claims(token, "access")
+        revocations.revoke_token(db, claims.get("jti"), user.id, claims["exp"])
+        if data.refresh_token is not None:
+            claims = JWTRepo.decode_claims(data.refresh_token, "refresh")
+            if int(claims["sub"]) == user.id:
+                revocations.revoke_token(db, claims.get("jti"), user.id, claims["exp"])
+    await db.commit()
+    return {"message": "Logged out"}
+
+
 @auth_router.get(
-    "/password-forgot-email/", response_model=schemas.Success, status_code=200
+    "/password-forgot-email/",
+    response_model=schemas.Success,
+    status_code=200,
+    dependencies=[Depends(limit_password_forgot)],
 )
 async def password_forgot_email(
-    bg_task: BackgroundTasks,
-    email: str = Query(...),
-    db: AsyncSession = Depends(get_db),
+    email: str = Query(...), db: AsyncSession = Depends(get_db)
 ):
     result = await db.execute(select(User).filter_by(email=email))
     user = result.scalar_one_or_none()
     if user is None or not user.is_active:
         raise HTTPException(403, "Invalid user")
-    bg_task.add_task(send_forgot_password_email, user)
+    queue_forgot_password_email(db, user)
+    await db.commit()
     return {"message": "Email to reset password sent"}
 
 
 @auth_router.post(
-    "/password-reset/", response_model=schemas.UserResponse, status_code=200
+    "/password-reset/", response_model=schemas.PasswordResetOutput, status_code=200
 )
 async def password_reset(
     data: schemas.PasswordResetInput = Body(), db: AsyncSession = Depends(get_db)
 ):
     try:
-        user_id = JWTRepo.decode_token(data.reset_token, "reset")
-        result = await db.execute(select(User).filter_by(id=user_id))
-        user_obj = result.scalar_one_or_none()
-        if user_obj is None or not user_obj.is_active:
+        user_id = int(JWTRepo.decode_token(data.reset_token, "reset"))
+        password = await hashing_pool.hash(data.password)
+        user_obj = await db.scalar(
+            update(User)
+            .where(User.id == user_id, User.is_active.is_(True))
+            .values(password=password)
+            .returning(User)
+            .execution_options(synchronize_session=False)
+        )
+        if user_obj is None:
             raise HTTPException(403, "Invalid user")
-        user_obj.hash(data.password)
+        revocations.revoke_user(db, user_obj.id)
         await db.commit()
-        await db.refresh(user_obj)
-        return {"user": user_obj, "message": "Password reset done"}
+        invalidate_user(user_obj.id)
+        return model_response(
+            schemas.PasswordResetOutput,
+            {"user": user_obj, "message": "Password reset done"},
+        )
+    except HTTPException:
+        await db.rollback()
+        raise
     except Exception as exc:
         await db.rollback()
         raise HTTPException(400, "Password reset failed") from exc
@@ -1,4 +1,5 @@
 from datetime import datetime
+from typing import Optional
 
 from pydantic import BaseModel, ConfigDict, EmailStr
 
@@ -20,6 +21,16 @@ class UserResponse(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+class AuthUser(BaseModel):
+    id: int
+    full_name: str
+    email: str
+    username: str
+    is_active: bool
+    is_confirmed: bool
+    model_config = ConfigDict(from_attributes=True)
+
+
 class LoginResponse(BaseModel):
     token_type: str
     access_token: str
@@ -39,6 +50,12 @@ class RefreshTokenInput(BaseModel):
 class RefreshTokenResponse(BaseModel):
     token_type: str
     access_token: str
+    refresh_token: str
+
+
+class LogoutInput(BaseModel):
+    refresh_token: Optional[str] = None
+    everywhere: bool = False
 
 
 class PasswordResetInput(BaseModel):
@@ -1,45 +1,59 @@
 import logging
-import smtplib
 import textwrap
+import time
+import uuid
 from datetime import datetime, timedelta, timezone
-from email.mime.multipart import MIMEMultipart
-from email.mime.text import MIMEText
 from typing import Literal
 
 from fastapi import Depends, HTTPException
 from fastapi.security import OAuth2PasswordBearer
-from jose import JWTError, jwt
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.sql import select
 
+from ..common import TTLCache
 from ..config import get_db, global_config
+from ..mail import EmailOutbox
 from .models import User
+from .revocation import revocations
+from .schemas import AuthUser
 
 logger = logging.getLogger(__name__)
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/user/login/")
+user_cache = TTLCache(global_config.USER_CACHE_SIZE, global_config.USER_CACHE_TTL)
 
 
 class JWTRepo:
+    # jose is imported on first use to keep it out of startup.
     @staticmethod
     def create_token(
         user_id: int,
         token_type: Literal["access", "confirm", "refresh", "reset"],
         expiry_minutes: int = 30,
     ):
+        from jose import JWTError, jwt
+
         try:
             expires = datetime.now(timezone.utc) + timedelta(minutes=expiry_minutes)
-            payload = {"sub": str(user_id), "exp": expires, "type": token_type}
+            payload = {
+                "sub": str(user_id),
+                "exp": expires,
+                "type": token_type,
+                "jti": uuid.uuid4().hex,
+                "iat": time.time(),
+            }
             return jwt.encode(
                 payload, key=global_config.SECRET_KEY, algorithm=global_config.ALGORITHM
             )
         except JWTError as exc:
-            logger.error(f"{token_type} JWT token could not be created : {str(exc)}")
+            logger.error("%s JWT token could not be created : %s", token_type, exc)
             raise exc
 
     @staticmethod
-    def decode_token(
+    def decode_claims(
         token: str, token_type: Literal["access", "confirm", "refresh", "reset"]
-    ) -> int:
+    ) -> dict:
+        from jose import jwt
+
         try:
             payload = jwt.decode(
                 token, key=global_config.SECRET_KEY, algorithms=global_config.ALGORITHM
@@ -53,44 +67,61 @@ class JWTRepo:
                 raise HTTPException(401, "Invalid token")
             if datetime.fromtimestamp(exp, timezone.utc) < datetime.now(timezone.utc):
                 raise HTTPException(401, "Token has expired")
-            return user_id
+            return payload
         except Exception as exc:
             raise HTTPException(401, "Token has expired") from exc
 
+    @staticmethod
+    def decode_token(
+        token: str, token_type: Literal["access", "confirm", "refresh", "reset"]
+    ) -> int:
+        return JWTRepo.decode_claims(token, token_type)["sub"]
+
 
-async def current_user(
-    token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)
-):
-    user_id = JWTRepo.decode_token(token, "access")
-    result = await db.execute(select(User).filter_by(id=user_id))
-    auth_user = result.scalar_one_or_none()
+async def load_auth_user(user_id: int, db: AsyncSession) -> AuthUser:
+    auth_user = user_cache.get(user_id)
     if auth_user is None:
-        raise HTTPException(401, "Invalid user")
+        result = await db.execute(select(User).filter_by(id=user_id))
+        db_user = result.scalar_one_or_none()
+        if db_user is None:
+            raise HTTPException(401, "Invalid user")
+        auth_user = AuthUser.model_validate(db_user)
+        user_cache.set(user_id, auth_user)
     return auth_user
 
 
-def send_mail(from_email, to_email, subject, content, content_type):
-    message = MIMEMultipart()
-    message["From"] = from_email
-    message["To"] = to_email
-    message["Subject"] = subject
-    message.attach(MIMEText(content, content_type))
-    try:
-        with smtplib.SMTP(
-            global_config.EMAIL_SERVER, int(global_config.EMAIL_PORT)
-        ) as server:
-            server.starttls()
-            server.login(global_config.EMAIL_USER, global_config.EMAIL_PASSWORD)
-            server.sendmail(from_email, to_email, message.as_string())
-            logger.info(f"Email sent to {to_email}")
-    except Exception as exc:
-        logger.error(f"Error sending email to {to_email}: {exc}")
-
-
-def send_user_confirm_email(user: User):
+async def current_user(
+    token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)
+) -> AuthUser:
+    claims = JWTRepo.decode_claims(token, "access")
+    user_id = int(claims["sub"])
+    if revocations.is_revoked(claims.get("jti"), user_id, claims.get("iat", 0)):
+        raise HTTPException(401, "Token has been revoked")
+    return await load_auth_user(user_id, db)
+
+
+def invalidate_user(user_id: int):
+    """Drop the cached copy of a user whose row changed (password, confirmation, activation)."""
+    user_cache.invalidate(int(user_id))
+
+
+def queue_mail(db: AsyncSession, to_email, subject, content, content_type):
+    """Add an email to the outbox; it is sent once the caller's transaction commits."""
+    sender_email = f"{global_config.WEBSITE_NAME}<{global_config.EMAIL_USER}>"
+    db.add(
+        EmailOutbox(
+            sender=sender_email,
+            recipient=to_email,
+            subject=subject,
+            body=content,
+            content_type=content_type,
+        )
+    )
+
+
+def queue_user_confirm_email(db: AsyncSession, user: User):
     token = JWTRepo.create_token(user.id, "confirm", 1440)
     url_endpoint = f"{global_config.USER_CONFIRM_ENDPOINT}{token}"
-    sender_email = f"{global_config.WEBSITE_NAME}<{global_config.EMAIL_USER}>"
     subject = "Activate Your Account"
     body = textwrap.dedent(
         f"""<div style="font-family: Verdana, Geneva, sans-serif;">\
@@ -99,13 +130,12 @@ def send_user_confirm_email(user: User):
         <p><a href="{global_config.WEBSITE_DOMAIN}{url_endpoint}">Confirm Your Email</a></p>\
         <br><p>Best Regards,</p><p>{global_config.WEBSITE_NAME}</p></div>"""
     )
-    send_mail(sender_email, user.email, subject, body, "html")
+    queue_mail(db, user.email, subject, body, "html")
 
 
-def send_forgot_password_email(user: User):
+def queue_forgot_password_email(db: AsyncSession, user: User):
     token = JWTRepo.create_token(user.id, "reset", 1440)
     url_endpoint = f"/api/user/password-forgot/{token}"
-    sender_email = f"{global_config.WEBSITE_NAME}<{global_config.EMAIL_USER}>"
     subject = "Reset Your password"
     body = textwrap.dedent(
         f"""<div style="font-family: Verdana, Geneva, sans-serif;">\
@@ -114,4 +144,4 @@ def send_forgot_password_email(user: User):
         <a href="{global_config.WEBSITE_DOMAIN}{url_endpoint}">Reset Password</a></p>\
         <br><p>Best Regards,</p><p>{global_config.WEBSITE_NAME}</p></div>"""
     )
-    send_mail(sender_email, user.email, subject, body, "html")
+    queue_mail(db, user.email, subject, body, "html")
@@ -0,0 +1,33 @@
+from .cache import TTLCache as TTLCache
+from .conditional import etag_matches as etag_matches
+from .conditional import not_modified as not_modified
+from .hll import HyperLogLog as HyperLogLog
+from .ndjson import NDJSON_MEDIA_TYPE as NDJSON_MEDIA_TYPE
+from .ndjson import read_ndjson as read_ndjson
+from .ndjson import stream_ndjson as stream_ndjson
+from .pagination import keyset_page as keyset_page
+from .pagination import next_cursor as next_cursor
+from .projection import make_excerpt as make_excerpt
+from .projection import select_fields as select_fields
+from .ratelimit import RateLimiter as RateLimiter
+from .responses import FastJSONResponse as FastJSONResponse
+from .responses import model_response as model_response
+from .responses import serialize as serialize
+
+__all__ = [
+    "NDJSON_MEDIA_TYPE",
+    "FastJSONResponse",
+    "HyperLogLog",
+    "RateLimiter",
+    "TTLCache",
+    "etag_matches",
+    "keyset_page",
+    "make_excerpt",
+    "model_response",
+    "next_cursor",
+    "not_modified",
+    "read_ndjson",
+    "select_fields",
+    "serialize",
+    "stream_ndjson",
+]
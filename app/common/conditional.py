@@ -0,0 +1,34 @@
+from email.utils import parsedate_to_datetime
+from typing import Mapping, Optional
+
+from fastapi import Request, Response
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    candidates = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return etag in candidates or "*" in candidates
+
+
+def not_modified(request: Request, headers: Mapping[str, str]) -> Optional[Response]:
+    """
+    304 with `headers` when the client's copy is still current, else None.
+    - `If-None-Match` is checked against the ETag and, when sent, decides alone.
+    - `If-Modified-Since` is compared with `Last-Modified` (second resolution).
+    """
+    if request.headers.get("if-none-match"):
+        if etag_matches(request, headers["ETag"]):
+            return Response(status_code=304, headers=headers)
+        return None
+    since = request.headers.get("if-modified-since")
+    last_modified = headers.get("Last-Modified")
+    if not since or not last_modified:
+        return None
+    try:
+        if parsedate_to_datetime(last_modified) <= parsedate_to_datetime(since):
+            return Response(status_code=304, headers=headers)
+    except (TypeError, ValueError):
+        pass
+    return None
@@ -0,0 +1,63 @@
+from typing import Any, AsyncIterator
+
+from fastapi import HTTPException, Request
+from pydantic import BaseModel, ValidationError
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.sql import Select
+
+from .responses import schema_adapter
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+async def stream_ndjson(
+    session_factory: sessionmaker, query: Select, schema: Any, chunk_size: int
+) -> AsyncIterator[bytes]:
+    """
+    Yield `query` rows as NDJSON, `chunk_size` rows at a time.
+    - Opens its own session from `session_factory`: the request's session
+      is closed before a streaming response body is sent.
+    - Rows come from a server-side cursor, so memory stays constant.
+    """
+    adapter = schema_adapter(schema)
+    async with session_factory() as session:
+        result = await session.stream(query.execution_options(yield_per=chunk_size))
+        async for rows in result.partitions():
+            yield b"".join(
+                adapter.dump_json(adapter.validate_python(row, from_attributes=True))
+                + b"\n"
+                for row in rows
+            )
+
+
+async def read_ndjson(
+    request: Request, schema: type[BaseModel], chunk_size: int
+) -> AsyncIterator[list[BaseModel]]:
+    """Parse the request body as NDJSON into batches of at most `chunk_size` items."""
+    batch: list[BaseModel] = []
+    buffer = b""
+    line_number = 0
+
+    def parse(line: bytes):
+        try:
+            batch.append(schema.model_validate_json(line))
+        except ValidationError as exc:
+            raise HTTPException(
+                400, f"Invalid record on line {line_number}: {exc.errors()[0]['msg']}"
+            ) from exc
+
+    async for chunk in request.stream():
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            line_number += 1
+            if line.strip():
+                parse(line)
+            if len(batch) >= chunk_size:
+                yield batch
+                batch = []
+    if buffer.strip():
+        line_number += 1
+        parse(buffer)
+    if batch:
+        yield batch
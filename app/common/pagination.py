@@ -0,0 +1,70 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, Optional, Sequence
+
+from fastapi import HTTPException
+from sqlalchemy import DateTime, String, TypeDecorator
+from sqlalchemy.sql import Select, literal, tuple_
+
+
+class CursorTimestamp(TypeDecorator):
+    """
+    Bind type for the cursor's `created_at`.
+    - SQLite stores `server_default=func.now()` as text without microseconds,
+      so the bound value must use the same text form to compare correctly.
+    """
+
+    impl = DateTime
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == "sqlite":
+            return dialect.type_descriptor(String())
+        return dialect.type_descriptor(DateTime())
+
+    def process_bind_param(self, value, dialect):
+        if dialect.name == "sqlite" and value is not None:
+            return value.isoformat(sep=" ")
+        return value
+
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    raw = json.dumps([created_at.isoformat(), row_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, row_id = json.loads(raw)
+        return datetime.fromisoformat(created_at), int(row_id)
+    except Exception as exc:
+        raise HTTPException(400, "Invalid cursor") from exc
+
+
+def keyset_page(
+    query: Select, model: Any, cursor: str, limit: int, descending: bool = True
+) -> Select:
+    """
+    Apply `(created_at, id)` keyset pagination to `query`.
+    - An empty cursor selects the first page.
+    - One extra row is fetched so `next_cursor` can tell whether more rows exist.
+    """
+    key = tuple_(model.created_at, model.id)
+    if cursor:
+        created_at, row_id = decode_cursor(cursor)
+        position = tuple_(literal(created_at, CursorTimestamp()), literal(row_id))
+        query = query.where(key < position if descending else key > position)
+    if descending:
+        query = query.order_by(model.created_at.desc(), model.id.desc())
+    else:
+        query = query.order_by(model.created_at, model.id)
+    return query.limit(limit + 1)
+
+
+def next_cursor(rows: Sequence[Any], limit: int) -> Optional[str]:
+    if len(rows) <= limit:
+        return None
+    last = rows[limit - 1]
+    return encode_cursor(last.created_at, last.id)
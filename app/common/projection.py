@@ -0,0 +1,27 @@
+import re
+from typing import Any, Optional
+
+from fastapi import HTTPException
+
+
+def select_fields(
+    columns: list[Any], optional: dict[str, Any], fields: Optional[str]
+) -> list[Any]:
+    """
+    Columns for a list query: the always-present `columns` plus any of the
+    `optional` ones named in the comma separated `fields` query parameter.
+    """
+    names = (name.strip() for name in (fields or "").split(","))
+    requested = list(dict.fromkeys(name for name in names if name))
+    unknown = [name for name in requested if name not in optional]
+    if unknown:
+        raise HTTPException(400, f"Unsupported fields: {', '.join(unknown)}")
+    return columns + [optional[name] for name in requested]
+
+
+def make_excerpt(body: Optional[str], length: int) -> str:
+    text = re.sub(r"\s+", " ", body or "").strip()
+    if len(text) <= length:
+        return text
+    cut = text[:length].rsplit(" ", 1)[0] or text[:length]
+    return cut.rstrip(".,;:") + "…"
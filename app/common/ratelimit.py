@@ -0,0 +1,66 @@
+import time
+from typing import Hashable
+
+
+class RateLimiter:
+    """
+    Token bucket per key: `limit` requests per `period` seconds, refilled evenly.
+    - Buckets are spread over `shards` dicts by key hash; when a shard outgrows
+      its share of `max_keys`, only that shard is pruned.
+    - Full buckets are dropped first, then the least recently used ones.
+    - `hit` returns 0 when the request may go ahead, otherwise the seconds to wait.
+    """
+
+    def __init__(
+        self,
+        limit: int,
+        period: float,
+        shards: int = 16,
+        max_keys: int = 100000,
+        enabled: bool = True,
+    ):
+        self.limit = limit
+        self.period = period
+        self.rate = limit / period
+        self.enabled = enabled
+        self._shards: list[dict[Hashable, tuple[float, float]]] = [
+            {} for _ in range(max(1, shards))
+        ]
+        self._shard_max = max(1, max_keys // len(self._shards))
+        self.allowed = 0
+        self.rejected = 0
+
+    def hit(self, key: Hashable) -> float:
+        if not self.enabled:
+            return 0.0
+        now = time.monotonic()
+        shard = self._shards[hash(key) % len(self._shards)]
+        tokens, updated = shard.pop(key, (self.limit, now))
+        tokens = min(self.limit, tokens + (now - updated) * self.rate)
+        if tokens < 1:
+            shard[key] = (tokens, now)
+            self.rejected += 1
+            return (1 - tokens) / self.rate
+        shard[key] = (tokens - 1, now)
+        if len(shard) > self._shard_max:
+            self._prune(shard, now)
+        self.allowed += 1
+        return 0.0
+
+    def _prune(self, shard: dict, now: float):
+        # Any bucket left alone for a whole period has refilled completely.
+        for key in [k for k, (_, seen) in shard.items() if now - seen >= self.period]:
+            del shard[key]
+        while len(shard) > self._shard_max:
+            del shard[next(iter(shard))]
+
+    def clear(self):
+        for shard in self._shards:
+            shard.clear()
+
+    def stats(self) -> dict:
+        return {
+            "keys": sum(len(shard) for shard in self._shards),
+            "allowed": self.allowed,
+            "rejected": self.rejected,
+        }
@@ -0,0 +1,52 @@
+from functools import lru_cache
+from typing import Any, Mapping, Optional
+
+from fastapi.responses import ORJSONResponse
+from pydantic import TypeAdapter
+
+
+class FastJSONResponse(ORJSONResponse):
+    """
+    Default response class of the app.
+    - dict/list content returned by handlers is encoded with orjson.
+    - bytes content, already serialized by `model_response`, is sent as is.
+    """
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        return super().render(content)
+
+
+@lru_cache(maxsize=None)
+def schema_adapter(schema: Any) -> TypeAdapter:
+    return TypeAdapter(schema)
+
+
+def serialize(schema: Any, content: Any, exclude_unset: bool = False) -> bytes:
+    """
+    Validate `content` (ORM objects, rows or dicts) against `schema` once and
+    dump it straight to JSON bytes with pydantic-core's compiled serializer.
+    """
+    adapter = schema_adapter(schema)
+    value = adapter.validate_python(content, from_attributes=True)
+    return adapter.dump_json(value, exclude_unset=exclude_unset)
+
+
+def model_response(
+    schema: Any,
+    content: Any,
+    status_code: int = 200,
+    exclude_unset: bool = False,
+    headers: Optional[Mapping[str, str]] = None,
+) -> FastJSONResponse:
+    """
+    Fast path for handlers: returning a Response makes FastAPI skip its own
+    `response_model` validation, jsonable encoding and json.dumps pass.
+    Keep `response_model` on the route so the OpenAPI schema stays the same.
+    """
+    return FastJSONResponse(
+        serialize(schema, content, exclude_unset),
+        status_code=status_code,
+        headers=headers,
+    )
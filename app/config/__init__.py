@@ -1,6 +1,21 @@
 from .db import Base as Base
+from .db import check_database as check_database
+from .db import engine as engine
 from .db import get_db as get_db
+from .db import get_read_db as get_read_db
 from .db import lifespan as lifespan
+from .db import pool_stats as pool_stats
+from .db import read_sessionmaker as read_sessionmaker
 from .settings import global_config as global_config
 
-__all__ = ["Base", "get_db", "global_config", "lifespan"]
+__all__ = [
+    "Base",
+    "check_database",
+    "engine",
+    "get_db",
+    "get_read_db",
+    "global_config",
+    "lifespan",
+    "pool_stats",
+    "read_sessionmaker",
+]
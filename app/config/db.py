@@ -1,21 +1,154 @@
+import asyncio
+import itertools
+import logging
+import time
 from contextlib import asynccontextmanager
-from typing import AsyncGenerator
+from typing import AsyncGenerator, Optional
 
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
-from sqlalchemy.orm import DeclarativeBase, sessionmaker
+from fastapi import Request
+from sqlalchemy import event, make_url, text
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+from sqlalchemy.orm import DeclarativeBase, Session, sessionmaker
 
 from .log import configure_logging
+from .pool import InstrumentedPool
 from .settings import global_config
 
-engine = create_async_engine(global_config.DATABASE_URL)
+logger = logging.getLogger(__name__)
+
+
+def build_engine(database_url: str) -> AsyncEngine:
+    """
+    Create an engine with the pool settings from `GlobalConfig`.
+    - In-memory SQLite keeps SQLAlchemy's default single-connection pool.
+    - The asyncpg prepared statement cache is sized per connection.
+    """
+    url = make_url(database_url)
+    options = {"query_cache_size": global_config.DB_QUERY_CACHE_SIZE}
+    if url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:"):
+        return create_async_engine(url, **options)
+    if url.get_driver_name() == "asyncpg":
+        url = url.update_query_dict(
+            {
+                "prepared_statement_cache_size": str(
+                    global_config.DB_STATEMENT_CACHE_SIZE
+                )
+            }
+        )
+    return create_async_engine(
+        url,
+        poolclass=InstrumentedPool,
+        pool_size=global_config.DB_POOL_SIZE,
+        max_overflow=global_config.DB_MAX_OVERFLOW,
+        pool_timeout=global_config.DB_POOL_TIMEOUT,
+        pool_recycle=global_config.DB_POOL_RECYCLE,
+        pool_pre_ping=global_config.DB_POOL_PRE_PING,
+        **options,
+    )
+
+
+def pool_stats(engine: AsyncEngine) -> dict:
+    pool = engine.sync_engine.pool
+    return pool.stats() if isinstance(pool, InstrumentedPool) else {}
+
+
+async def ping(engine: AsyncEngine):
+    async with engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+
+
+async def check_database(engine: AsyncEngine) -> bool:
+    try:
+        await asyncio.wait_for(ping(engine), global_config.DB_READY_TIMEOUT)
+        return True
+    except (asyncio.TimeoutError, SQLAlchemyError, OSError) as exc:
+        logger.warning("Database readiness check failed: %r", exc)
+        return False
+
+
+UPSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+
+def upsert(session: AsyncSession, table):
+    # INSERT with `on_conflict_do_update` for the session's dialect.
+    return UPSERTS[session.bind.dialect.name](table)
+
+
+engine = build_engine(global_config.DATABASE_URL)
+# Rows come back from INSERT/UPDATE ... RETURNING already complete, so they
+# stay readable after commit instead of being reloaded with another SELECT.
 async_session = sessionmaker(
-    engine, class_=AsyncSession, autoflush=False, autocommit=False
+    engine,
+    class_=AsyncSession,
+    autoflush=False,
+    autocommit=False,
+    expire_on_commit=False,
 )
+read_engines = [
+    build_engine(url.strip())
+    for url in (global_config.DATABASE_READ_URLS or "").split(",")
+    if url.strip()
+]
+read_sessions = [
+    sessionmaker(read_engine, class_=AsyncSession, autoflush=False, autocommit=False)
+    for read_engine in read_engines
+]
+next_read_session = itertools.cycle(read_sessions)
+recent_writers: dict[str, float] = {}
+RECENT_WRITERS_MAX = 10000
 
 
-async def get_db() -> AsyncGenerator[AsyncSession, None]:
+@event.listens_for(Session, "after_commit")
+def remember_commit(session: Session):
+    session.info["committed"] = True
+
+
+def writer_key(request: Request) -> Optional[str]:
+    return request.headers.get("authorization")
+
+
+def mark_write(key: str):
+    """Keep `key` reading from the primary for READ_YOUR_WRITES_WINDOW seconds."""
+    now = time.monotonic()
+    # Re-inserting keeps the dict ordered from the oldest write to the newest.
+    recent_writers.pop(key, None)
+    recent_writers[key] = now + global_config.READ_YOUR_WRITES_WINDOW
+    if len(recent_writers) > RECENT_WRITERS_MAX:
+        for stale in [k for k, until in recent_writers.items() if until <= now]:
+            del recent_writers[stale]
+        while len(recent_writers) > RECENT_WRITERS_MAX:
+            recent_writers.pop(next(iter(recent_writers)))
+
+
+def recent_writer(request: Request) -> bool:
+    key = writer_key(request)
+    return key is not None and recent_writers.get(key, 0) > time.monotonic()
+
+
+def read_sessionmaker(request: Request) -> sessionmaker:
+    """
+    Pick the session factory for a read-only request.
+    - Replicas are used round-robin; without DATABASE_READ_URLS it is the primary.
+    - A client that committed a write recently stays on the primary.
+    """
+    if not read_sessions or recent_writer(request):
+        return async_session
+    return next(next_read_session)
+
+
+async def get_db(request: Request) -> AsyncGenerator[AsyncSession, None]:
     async with async_session() as session:
         yield session
+        key = writer_key(request)
+        if read_sessions and key is not None and session.info.get("committed"):
+            mark_write(key)
+
+
+async def get_read_db(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    async with read_sessionmaker(request)() as session:
+        yield session
 
 
 class Base(DeclarativeBase):
@@ -24,7 +157,39 @@ class Base(DeclarativeBase):
 
 @asynccontextmanager
 async def lifespan(app):
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
-    configure_logging()
+    from ..auth.hashing import hashing_pool
+    from ..auth.last_login import last_login_buffer
+    from ..auth.revocation import revocations
+    from ..mail.worker import create_worker
+    from ..posts.comments import comment_buffer
+    from ..posts.snapshot import front_page
+    from ..posts.views import view_counter
+    from .schema import ensure_schema
+
+    log_listener = configure_logging()
+    await ensure_schema(engine)
+    await revocations.sync()
+    stop = asyncio.Event()
+    last_login_task = asyncio.create_task(last_login_buffer.run(stop))
+    revocation_task = asyncio.create_task(revocations.run(stop))
+    comment_task = asyncio.create_task(comment_buffer.run(stop))
+    front_page_task = asyncio.create_task(front_page.run(stop))
+    view_task = asyncio.create_task(view_counter.run(stop))
+    outbox_task = None
+    outbox_worker = create_worker() if global_config.EMAIL_WORKER_IN_PROCESS else None
+    if outbox_worker is not None:
+        outbox_task = asyncio.create_task(outbox_worker.run(stop))
     yield
+    stop.set()
+    await last_login_task
+    await revocation_task
+    await comment_task
+    await front_page_task
+    await view_task
+    if outbox_task is not None:
+        await outbox_task
+    hashing_pool.shutdown()
+    for read_engine in read_engines:
+        await read_engine.dispose()
+    if log_listener is not None:
+        log_listener.stop()
@@ -1,60 +1,132 @@
-from logging.config import dictConfig
+import copy
+import itertools
+import logging
+import queue
+from contextvars import ContextVar
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+
+import orjson
 
 from .settings import global_config
 
+request_id: ContextVar[str] = ContextVar("request_id", default="-")
+
+
+class RequestContextFilter(logging.Filter):
+    """Stamp records with the current request id, in the thread that logs them."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id.get()
+        return True
+
+
+class DebugSampler(logging.Filter):
+    """Keep one in `every` DEBUG records; INFO and above always pass."""
+
+    def __init__(self, every: int):
+        super().__init__()
+        self.every = max(every, 1)
+        self.seen = itertools.count()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.DEBUG or self.every == 1:
+            return True
+        return next(self.seen) % self.every == 0
+
 
-def configure_logging():
-    dictConfig(
-        {
-            "version": 1,
-            "disable_existing_loggers": False,
-            "formatters": {
-                "console_formatter": {
-                    "class": "logging.Formatter",
-                    "format": "%(levelname)s:     %(message)s",
-                },
-                "file_formatter": {
-                    "class": "logging.Formatter",
-                    "datefmt": "%Y-%m-%dT%H:%M:%S",
-                    "format": "%(levelname)-8s | %(asctime)-20s | %(name)-20s | Line:%(lineno)-3d | %(message)s",
-                },
-            },
-            "handlers": {
-                "console": {
-                    "class": "logging.StreamHandler",
-                    "level": "DEBUG",
-                    "formatter": "console_formatter",
-                },
-                "file_handler": {
-                    "class": "logging.FileHandler",
-                    "level": "DEBUG",
-                    "formatter": "file_formatter",
-                    "filename": "app/api.log",
-                },
-            },
-            "loggers": {
-                "uvicorn": {"handlers": ["console", "file_handler"], "level": "INFO"},
-                "app": {
-                    "handlers": ["console", "file_handler"],
-                    "level": "INFO",
-                    "propagate": False,
-                },
-                "app.auth.router": {
-                    "handlers": ["console", "file_handler"],
-                    "level": ("DEBUG" if global_config.ENV_STATE == "dev" else "INFO"),
-                    "propagate": False,
-                },
-                "app.auth.utils": {
-                    "handlers": ["console", "file_handler"],
-                    "level": ("DEBUG" if global_config.ENV_STATE == "dev" else "INFO"),
-                    "propagate": False,
-                },
-                "app.posts.router": {
-                    "handlers": ["console", "file_handler"],
-                    "level": ("DEBUG" if global_config.ENV_STATE == "dev" else "INFO"),
-                    "propagate": False,
-                },
-            },
-            "root": {"handlers": ["console", "file_handler"], "level": "INFO"},
+class JSONFormatter(logging.Formatter):
+    """One JSON object per line, with request fields when the record carries them."""
+
+    EXTRA_FIELDS = ("request_id", "method", "path", "status", "latency_ms")
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": self.formatTime(record, self.datefmt),
+            "level": record.levelname,
+            "logger": record.name,
+            "line": record.lineno,
+            "message": record.getMessage(),
         }
+        for field in self.EXTRA_FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                entry[field] = value
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return orjson.dumps(entry, default=str).decode()
+
+
+class DeferredQueueHandler(QueueHandler):
+    """
+    Enqueue records for the listener thread to format.
+    - The message is merged with its args here, so later changes to them don't leak in.
+    - exc_info is kept, so the listener's formatters render the traceback.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+def build_formatters() -> tuple[logging.Formatter, logging.Formatter]:
+    datefmt = "%Y-%m-%dT%H:%M:%S"
+    if global_config.LOG_FORMAT == "json":
+        return JSONFormatter(datefmt=datefmt), JSONFormatter(datefmt=datefmt)
+    console = logging.Formatter("%(levelname)s:     %(message)s")
+    file = logging.Formatter(
+        "%(levelname)-8s | %(asctime)-20s | %(name)-20s | Line:%(lineno)-3d "
+        "| %(request_id)-16s | %(message)s",
+        datefmt=datefmt,
     )
+    return console, file
+
+
+def configure_logging() -> Optional[QueueListener]:
+    """
+    Configure app logging; returns the running listener when LOG_ASYNC is on.
+    - With LOG_ASYNC the loggers only enqueue records; a listener thread
+      formats them, tracebacks included, and does the console/file writes.
+    - The caller stops the returned listener at shutdown to flush the queue.
+    """
+    console_formatter, file_formatter = build_formatters()
+    console = logging.StreamHandler()
+    console.setFormatter(console_formatter)
+    file_handler = logging.FileHandler("app/api.log")
+    file_handler.setFormatter(file_formatter)
+    outputs = [console, file_handler]
+    listener = None
+    if global_config.LOG_ASYNC:
+        log_queue = queue.SimpleQueue()
+        listener = QueueListener(log_queue, *outputs, respect_handler_level=True)
+        entry_handlers = [DeferredQueueHandler(log_queue)]
+    else:
+        entry_handlers = outputs
+    for handler in entry_handlers:
+        handler.addFilter(RequestContextFilter())
+        handler.addFilter(DebugSampler(global_config.LOG_DEBUG_SAMPLE_EVERY))
+    debug_level = logging.DEBUG if global_config.ENV_STATE == "dev" else logging.INFO
+    levels = {
+        "": logging.INFO,
+        "uvicorn": logging.INFO,
+        "app": logging.INFO,
+        "app.access": logging.INFO if global_config.LOG_ACCESS else logging.WARNING,
+        "app.auth.router": debug_level,
+        "app.auth.utils": debug_level,
+        "app.posts.router": debug_level,
+    }
+    for name, level in levels.items():
+        logger = logging.getLogger(name)
+        for old_handler in logger.handlers[:]:
+            logger.removeHandler(old_handler)
+            old_handler.close()
+        for handler in entry_handlers:
+            logger.addHandler(handler)
+        logger.setLevel(level)
+        if name.startswith("app"):
+            logger.propagate = False
+    if listener is not None:
+        listener.start()
+    return listener
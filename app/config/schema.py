@@ -0,0 +1,173 @@
+"""
+Versioned database schema.
+- `schema_version` holds one row; startup reads it with a single query and
+  only runs `upgrade` when it is behind `SCHEMA_VERSION`.
+- `upgrade` creates missing tables (with their indexes), adds columns that
+  models gained since the database was created, then runs the steps of every
+  version it skipped.
+- `create_all` never adds an index to a table that already exists, so a
+  version that adds one lists `create_missing_indexes` in `UPGRADES`.
+- Bump `SCHEMA_VERSION` with every model change and add its steps to
+  `UPGRADES` if existing tables or rows need them.
+
+Upgrade ahead of a deploy instead of on the first worker to boot:
+    python -m app.config.schema
+"""
+
+import asyncio
+import logging
+
+from sqlalchemy import (
+    Column,
+    Connection,
+    Integer,
+    Table,
+    bindparam,
+    delete,
+    func,
+    inspect,
+    insert,
+    select,
+    text,
+    update,
+)
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.schema import CreateColumn
+
+from .db import Base
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_VERSION = 6
+
+schema_version = Table(
+    "schema_version",
+    Base.metadata,
+    Column("version", Integer, nullable=False),
+    # `python -m app.config.schema` defines it again under `__main__`.
+    extend_existing=True,
+)
+
+
+def add_missing_columns(conn: Connection):
+    # create_all never alters existing tables, so columns added to a model
+    # after its table was created are added here.
+    inspector = inspect(conn)
+    preparer = conn.dialect.identifier_preparer
+    for table in Base.metadata.sorted_tables:
+        present = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in present:
+                continue
+            ddl = CreateColumn(column).compile(dialect=conn.dialect)
+            conn.execute(
+                text(f"ALTER TABLE {preparer.format_table(table)} ADD COLUMN {ddl}")
+            )
+            logger.info("Added column %s.%s", table.name, column.name)
+
+
+def create_missing_indexes(conn: Connection):
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(conn, checkfirst=True)
+
+
+def backfill_comment_counts(conn: Connection):
+    from ..posts.models import Comment, Post
+
+    counts = (
+        select(func.count(Comment.id))
+        .where(Comment.post_id == Post.id)
+        .scalar_subquery()
+    )
+    conn.execute(update(Post).values(comment_count=counts))
+
+
+def backfill_excerpts(conn: Connection):
+    from ..common import make_excerpt
+    from ..diary.models import Draft
+    from ..posts.models import Post
+    from .settings import global_config
+
+    length = global_config.EXCERPT_LENGTH
+    for model in (Post, Draft):
+        while True:
+            rows = conn.execute(
+                select(model.id, model.body)
+                .where(model.excerpt.is_(None))
+                .order_by(model.id)
+                .limit(1000)
+            ).all()
+            if not rows:
+                break
+            conn.execute(
+                update(model)
+                .where(model.id == bindparam("row_id"))
+                .values(excerpt=bindparam("row_excerpt")),
+                [
+                    {"row_id": row.id, "row_excerpt": make_excerpt(row.body, length)}
+                    for row in rows
+                ],
+            )
+
+
+UPGRADES = {
+    1: [backfill_comment_counts, backfill_excerpts],
+    # Keyset pagination indexes on posts, drafts and comments, which databases
+    # created before them never got.
+    6: [create_missing_indexes],
+}
+
+
+def upgrade(conn: Connection, current: int):
+    Base.metadata.create_all(conn)
+    add_missing_columns(conn)
+    for version in range(current + 1, SCHEMA_VERSION + 1):
+        for step in UPGRADES.get(version, []):
+            step(conn)
+    conn.execute(delete(schema_version))
+    conn.execute(insert(schema_version).values(version=SCHEMA_VERSION))
+
+
+async def current_version(engine: AsyncEngine) -> int:
+    try:
+        async with engine.connect() as conn:
+            result = await conn.execute(select(schema_version.c.version))
+            return result.scalar() or 0
+    except DBAPIError:
+        return 0
+
+
+async def ensure_schema(engine: AsyncEngine) -> int:
+    from ..posts.search import ensure_search_index, rebuild_search_index
+
+    current = await current_version(engine)
+    if current >= SCHEMA_VERSION:
+        if current > SCHEMA_VERSION:
+            logger.warning(
+                "Database schema version %s is newer than this code (%s)",
+                current,
+                SCHEMA_VERSION,
+            )
+        return current
+    async with engine.begin() as conn:
+        await conn.run_sync(upgrade, current)
+        await ensure_search_index(conn)
+        if current == 0:
+            await rebuild_search_index(conn)
+    logger.info("Database schema upgraded from %s to %s", current, SCHEMA_VERSION)
+    return SCHEMA_VERSION
+
+
+async def main():
+    from ..main import app  # noqa: F401 - registers every model on Base.metadata
+    from .db import engine
+
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s:     %(message)s")
+    await ensure_schema(engine)
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -6,15 +6,67 @@ from pydantic_settings import BaseSettings, SettingsConfigDict
 class GlobalConfig(BaseSettings):
     ENV_STATE: Optional[str] = None
     DATABASE_URL: Optional[str] = None
+    DATABASE_READ_URLS: Optional[str] = None
+    READ_YOUR_WRITES_WINDOW: float = 5
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = False
+    DB_QUERY_CACHE_SIZE: int = 500
+    DB_STATEMENT_CACHE_SIZE: int = 100
+    DB_READY_TIMEOUT: float = 2
     SECRET_KEY: Optional[str] = None
     ALGORITHM: Optional[str] = None
     EMAIL_USER: Optional[str] = None
     EMAIL_PASSWORD: Optional[str] = None
     EMAIL_SERVER: Optional[str] = None
     EMAIL_PORT: Optional[str] = None
+    EMAIL_USE_TLS: bool = True
+    EMAIL_POOL_SIZE: int = 2
+    EMAIL_BATCH_SIZE: int = 50
+    EMAIL_MAX_ATTEMPTS: int = 5
+    EMAIL_RETRY_BACKOFF: float = 30
+    EMAIL_POLL_INTERVAL: float = 2
+    EMAIL_SEND_LEASE: float = 300
+    EMAIL_WORKER_IN_PROCESS: bool = True
     WEBSITE_DOMAIN: Optional[str] = None
     WEBSITE_NAME: Optional[str] = None
     USER_CONFIRM_ENDPOINT: Optional[str] = None
+    REFRESH_TOKEN_MINUTES: int = 1440
+    REVOCATION_SYNC_INTERVAL: float = 5
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_SHARDS: int = 16
+    RATE_LIMIT_MAX_KEYS: int = 100000
+    LOGIN_LIMIT_PER_IP: int = 20
+    LOGIN_LIMIT_PER_USER: int = 10
+    PASSWORD_FORGOT_LIMIT_PER_IP: int = 10
+    PASSWORD_FORGOT_LIMIT_PER_EMAIL: int = 3
+    HASH_POOL_KIND: str = "thread"
+    HASH_POOL_WORKERS: int = 4
+    HASH_POOL_MAX_QUEUE: int = 64
+    LAST_LOGIN_FLUSH_INTERVAL: float = 5
+    LAST_LOGIN_BUFFER_SIZE: int = 1000
+    USER_CACHE_SIZE: int = 10000
+    USER_CACHE_TTL: int = 60
+    POST_CACHE_SIZE: int = 1000
+    POST_CACHE_TTL: int = 30
+    FRONT_PAGE_PAGES: int = 5
+    FRONT_PAGE_MAX_AGE: float = 5
+    LIST_CACHE_MAX_AGE: int = 0
+    COMMENTS_IN_DETAIL: int = 20
+    VIEW_FLUSH_INTERVAL: float = 10
+    VIEW_BUFFER_SIZE: int = 1000
+    COMMENT_FLUSH_INTERVAL: float = 0.2
+    COMMENT_BATCH_SIZE: int = 500
+    COMMENT_BUFFER_SIZE: int = 10000
+    EXCERPT_LENGTH: int = 200
+    NDJSON_CHUNK_SIZE: int = 500
+    DRAFT_AUTOSAVE_WINDOW: float = 0.5
+    LOG_ASYNC: bool = True
+    LOG_FORMAT: str = "text"
+    LOG_ACCESS: bool = False
+    LOG_DEBUG_SAMPLE_EVERY: int = 1
     model_config = SettingsConfigDict(env_file="app/.env", extra="ignore")
 
 
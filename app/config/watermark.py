@@ -0,0 +1,90 @@
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from typing import Optional
+
+from sqlalchemy import Column, DateTime, Integer, String, Table, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .db import Base, upsert
+from .settings import global_config
+
+change_watermarks = Table(
+    "change_watermarks",
+    Base.metadata,
+    Column("scope", String(64), primary_key=True),
+    Column("version", Integer, nullable=False),
+    Column("changed_at", DateTime, nullable=False),
+)
+
+
+def posts_scope(user_id: Optional[int] = None) -> str:
+    return "posts" if user_id is None else f"posts:user:{user_id}"
+
+
+def drafts_scope(user_id: int) -> str:
+    return f"drafts:user:{user_id}"
+
+
+@dataclass
+class Watermark:
+    """
+    Version of everything a list endpoint can show for one scope.
+    - The ETag is the scope and version, so a poll that finds nothing new
+      costs one primary key lookup and no listing query.
+    - Per-user scopes are `private` and vary on `Authorization`.
+    """
+
+    scope: str
+    version: int
+    changed_at: Optional[datetime]
+
+    def headers(self, private: bool = False) -> dict[str, str]:
+        audience = "private" if private else "public"
+        max_age = global_config.LIST_CACHE_MAX_AGE
+        headers = {
+            "ETag": f'"{self.scope}-{self.version}"',
+            "Cache-Control": f"{audience}, max-age={max_age}, must-revalidate",
+        }
+        if self.changed_at is not None:
+            changed_at = self.changed_at.replace(tzinfo=timezone.utc)
+            headers["Last-Modified"] = format_datetime(changed_at, usegmt=True)
+        if private:
+            headers["Vary"] = "Authorization"
+        return headers
+
+
+async def read_watermark(db: AsyncSession, scope: str) -> Watermark:
+    result = await db.execute(
+        select(change_watermarks.c.version, change_watermarks.c.changed_at).where(
+            change_watermarks.c.scope == scope
+        )
+    )
+    row = result.one_or_none()
+    if row is None:
+        return Watermark(scope, 0, None)
+    return Watermark(scope, row.version, row.changed_at)
+
+
+async def bump_watermarks(db: AsyncSession, *scopes: str):
+    """
+    Advance `scopes` in the caller's transaction, so the new version commits
+    (or rolls back) with the change it stands for, on every worker at once.
+    Scopes are written in sorted order to keep concurrent bumps deadlock free.
+    """
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    query = upsert(db, change_watermarks).values(
+        [
+            {"scope": scope, "version": 1, "changed_at": now}
+            for scope in sorted(set(scopes))
+        ]
+    )
+    await db.execute(
+        query.on_conflict_do_update(
+            index_elements=[change_watermarks.c.scope],
+            set_={
+                "version": change_watermarks.c.version + 1,
+                "changed_at": query.excluded.changed_at,
+            },
+        )
+    )
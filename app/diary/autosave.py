@@ -0,0 +1,127 @@
+import asyncio
+from dataclasses import dataclass, field
+from typing import Optional
+
+from fastapi import HTTPException
+from sqlalchemy import func, select, update
+
+from ..common import make_excerpt
+from ..config import global_config
+from ..config.db import async_session
+from ..config.watermark import bump_watermarks, drafts_scope
+from .models import Draft
+
+
+@dataclass
+class PendingSave:
+    version: int
+    title: Optional[str]
+    body: Optional[str]
+    writing: bool = False
+    result: asyncio.Future = field(
+        default_factory=lambda: asyncio.get_running_loop().create_future()
+    )
+
+
+class DraftAutosaver:
+    """
+    Coalesces bursts of autosaves to the same draft into one UPDATE.
+    - The first save opens a `window` second wait; saves arriving meanwhile
+      with the same base version replace its title and body.
+    - The write is `UPDATE ... WHERE version = ? RETURNING`, so a draft
+      changed elsewhere since that version gets a 409 instead of being overwritten.
+    - Every coalesced request gets the result of the one write. A save that
+      arrives while that write runs waits for it and builds on its version.
+    """
+
+    def __init__(self, window: float = 0.5):
+        self.window = window
+        self._pending: dict[tuple[int, int], PendingSave] = {}
+        self._tasks: set[asyncio.Task] = set()
+        self.saves = 0
+        self.writes = 0
+
+    async def save(
+        self,
+        draft_id: int,
+        user_id: int,
+        version: int,
+        title: Optional[str],
+        body: Optional[str],
+    ) -> dict:
+        self.saves += 1
+        key = (draft_id, user_id)
+        pending = self._pending.get(key)
+        if pending is not None and pending.writing and pending.version == version:
+            saved = await asyncio.shield(pending.result)
+            self.saves -= 1
+            return await self.save(draft_id, user_id, saved["version"], title, body)
+        if pending is not None and not pending.writing:
+            if pending.version != version:
+                raise HTTPException(409, f"Draft {draft_id} has a newer version")
+            pending.title = title if title is not None else pending.title
+            pending.body = body if body is not None else pending.body
+        else:
+            pending = PendingSave(version, title, body)
+            self._pending[key] = pending
+            task = asyncio.create_task(self._write_later(key, pending))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        return await asyncio.shield(pending.result)
+
+    async def _write_later(self, key: tuple[int, int], pending: PendingSave):
+        await asyncio.sleep(self.window)
+        pending.writing = True
+        try:
+            pending.result.set_result(await self._write(*key, pending))
+        except Exception as exc:
+            pending.result.set_exception(exc)
+            pending.result.exception()  # waiters may all be gone; don't log it twice
+        finally:
+            if self._pending.get(key) is pending:
+                del self._pending[key]
+
+    async def _write(self, draft_id: int, user_id: int, pending: PendingSave) -> dict:
+        self.writes += 1
+        values = {"version": Draft.version + 1, "updated_at": func.now()}
+        if pending.title is not None:
+            values["title"] = pending.title
+        if pending.body is not None:
+            values["body"] = pending.body
+            values["excerpt"] = make_excerpt(pending.body, global_config.EXCERPT_LENGTH)
+        async with async_session() as session:
+            result = await session.execute(
+                update(Draft)
+                .where(
+                    Draft.id == draft_id,
+                    Draft.user_id == user_id,
+                    Draft.version == pending.version,
+                )
+                .values(**values)
+                .returning(Draft.id, Draft.version, Draft.updated_at)
+                .execution_options(synchronize_session=False)
+            )
+            saved = result.one_or_none()
+            if saved is not None:
+                await bump_watermarks(session, drafts_scope(user_id))
+                await session.commit()
+                return saved._asdict()
+            # Nothing matched: tell a missing draft from a stale version.
+            current = await session.scalar(
+                select(Draft.version).filter_by(id=draft_id, user_id=user_id)
+            )
+        if current is None:
+            raise HTTPException(404, f"Draft with id: {draft_id} not found")
+        raise HTTPException(
+            409, f"Draft {draft_id} is at version {current}, not {pending.version}"
+        )
+
+    def stats(self) -> dict:
+        return {
+            "pending": len(self._pending),
+            "saves": self.saves,
+            "writes": self.writes,
+        }
+
+
+draft_autosaver = DraftAutosaver(window=global_config.DRAFT_AUTOSAVE_WINDOW)
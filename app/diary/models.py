@@ -1,4 +1,4 @@
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, func
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String, func
 from sqlalchemy.orm import relationship
 
 from ..config import Base
@@ -8,6 +8,9 @@ class Draft(Base):
     """
     Model to store `Draft blogs`.
     - Only owner of draft blogs can access them.
+    - excerpt is a short plain-text prefix of body, computed on every write.
+    - version goes up by one on every update; autosaves only apply to the
+      version they were based on.
     - contain relationship to:
       - author = relationship("User", back_populates="drafts")
     """
@@ -17,7 +20,13 @@ class Draft(Base):
     id = Column(Integer, primary_key=True)
     title = Column(String(250))
     body = Column(String)
+    excerpt = Column(String, nullable=True)
+    version = Column(Integer, default=1, server_default="1", nullable=False)
     user_id = Column(Integer, ForeignKey("users.id"))
     created_at = Column(DateTime, server_default=func.now())
     updated_at = Column(DateTime, server_default=func.now(), server_onupdate=func.now())
     author = relationship("User", back_populates="drafts")
+
+    __table_args__ = (
+        Index("ix_drafts_user_id_created_at_id", "user_id", "created_at", "id"),
+    )
@@ -1,40 +1,131 @@
-from fastapi import APIRouter, Body, Depends, HTTPException, Path, Query
+from typing import Optional, Union
+
+from fastapi import APIRouter, Body, Depends, HTTPException, Path, Query, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy import func, insert, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.sql import select
 
 from ..auth import User, current_user
-from ..config import get_db
+from ..common import (
+    NDJSON_MEDIA_TYPE,
+    keyset_page,
+    make_excerpt,
+    model_response,
+    next_cursor,
+    not_modified,
+    read_ndjson,
+    select_fields,
+    stream_ndjson,
+)
+from ..config import get_db, get_read_db, global_config, read_sessionmaker
+from ..config.db import mark_write, read_sessions, writer_key
+from ..config.watermark import bump_watermarks, drafts_scope, read_watermark
 from . import schemas
+from .autosave import draft_autosaver
 from .models import Draft
 
 draft_router = APIRouter(prefix="/draft", tags=["Draft"])
 
 
-@draft_router.get("/", response_model=list[schemas.DraftResponse], status_code=200)
+def list_columns(fields: Optional[str]) -> list:
+    columns = [Draft.id, Draft.title, Draft.excerpt, Draft.created_at]
+    return select_fields(columns, {"body": Draft.body}, fields)
+
+
+@draft_router.get(
+    "/",
+    response_model=Union[list[schemas.DraftResponse], schemas.DraftPage],
+    response_model_exclude_unset=True,
+    status_code=200,
+)
 async def list_drafts(
+    request: Request,
     skip: int = Query(0),
-    limit: int = Query(10),
-    db: AsyncSession = Depends(get_db),
+    limit: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = Query(None),
+    fields: Optional[str] = Query(None),
+    db: AsyncSession = Depends(get_read_db),
     user: User = Depends(current_user),
 ):
-    result = await db.execute(
-        select(Draft).offset(skip).limit(limit).filter_by(user_id=user.id)
+    headers = (await read_watermark(db, drafts_scope(user.id))).headers(private=True)
+    cached = not_modified(request, headers)
+    if cached is not None:
+        return cached
+    query = select(*list_columns(fields)).filter(Draft.user_id == user.id)
+    if cursor is not None:
+        result = await db.execute(keyset_page(query, Draft, cursor, limit))
+        drafts = result.all()
+        page = {"items": drafts[:limit], "next_cursor": next_cursor(drafts, limit)}
+        return model_response(
+            schemas.DraftPage, page, exclude_unset=True, headers=headers
+        )
+    result = await db.execute(query.offset(skip).limit(limit))
+    drafts = result.all()
+    return model_response(
+        list[schemas.DraftResponse], drafts, exclude_unset=True, headers=headers
+    )
+
+
+@draft_router.get("/export", response_class=StreamingResponse, status_code=200)
+async def export_drafts(request: Request, user: User = Depends(current_user)):
+    query = (
+        select(Draft.title, Draft.body, Draft.created_at, Draft.updated_at)
+        .filter(Draft.user_id == user.id)
+        .order_by(Draft.id)
     )
-    drafts = result.scalars().all()
-    return drafts
+    chunks = stream_ndjson(
+        read_sessionmaker(request),
+        query,
+        schemas.DraftExport,
+        global_config.NDJSON_CHUNK_SIZE,
+    )
+    return StreamingResponse(chunks, media_type=NDJSON_MEDIA_TYPE)
+
+
+@draft_router.post("/import", response_model=schemas.ImportResult, status_code=201)
+async def import_drafts(
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    user: User = Depends(current_user),
+):
+    imported = 0
+    chunk_size = global_config.NDJSON_CHUNK_SIZE
+    try:
+        async for batch in read_ndjson(request, schemas.DraftIn, chunk_size):
+            rows = [
+                {
+                    "title": draft.title,
+                    "body": draft.body,
+                    "excerpt": make_excerpt(draft.body, global_config.EXCERPT_LENGTH),
+                    "user_id": user.id,
+                }
+                for draft in batch
+            ]
+            await db.execute(insert(Draft).values(rows))
+            await bump_watermarks(db, drafts_scope(user.id))
+            await db.commit()
+            imported += len(rows)
+    except HTTPException:
+        await db.rollback()
+        raise
+    except Exception as exc:
+        await db.rollback()
+        raise HTTPException(400, f"Import failed after {imported} drafts") from exc
+    return model_response(schemas.ImportResult, {"imported": imported}, 201)
 
 
 @draft_router.get("/{draft_id}", response_model=schemas.DraftDetail, status_code=200)
 async def detail_draft(
     draft_id: int = Path(...),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     user: User = Depends(current_user),
 ):
     result = await db.execute(select(Draft).filter_by(id=draft_id, user_id=user.id))
     draft = result.scalar_one_or_none()
     if draft is None:
         raise HTTPException(404, f"Draft with id: {draft_id} not found")
-    return draft
+    return model_response(schemas.DraftDetail, draft)
 
 
 @draft_router.post("/", response_model=schemas.DraftResponse, status_code=200)
@@ -44,12 +135,18 @@ async def create_draft(
     user: User = Depends(current_user),
 ):
     try:
-        db_draft = Draft(**draft.model_dump())
-        db_draft.user_id = user.id
-        db.add(db_draft)
+        db_draft = await db.scalar(
+            insert(Draft)
+            .values(
+                **draft.model_dump(),
+                user_id=user.id,
+                excerpt=make_excerpt(draft.body, global_config.EXCERPT_LENGTH),
+            )
+            .returning(Draft)
+        )
+        await bump_watermarks(db, drafts_scope(user.id))
         await db.commit()
-        await db.refresh(db_draft)
-        return db_draft
+        return model_response(schemas.DraftResponse, db_draft)
     except Exception as exc:
         await db.rollback()
         raise HTTPException(401, f"Draft could not be created") from exc
@@ -63,20 +160,47 @@ async def update_draft(
     user: User = Depends(current_user),
 ):
     try:
-        result = await db.execute(select(Draft).filter_by(id=draft_id, user_id=user.id))
-        db_draft = result.scalar_one_or_none()
+        values = {"version": Draft.version + 1, "updated_at": func.now()}
+        if draft.title:
+            values["title"] = draft.title
+        if draft.body:
+            values["body"] = draft.body
+            values["excerpt"] = make_excerpt(draft.body, global_config.EXCERPT_LENGTH)
+        db_draft = await db.scalar(
+            update(Draft)
+            .where(Draft.id == draft_id, Draft.user_id == user.id)
+            .values(**values)
+            .returning(Draft)
+            .execution_options(synchronize_session=False)
+        )
         if db_draft is None:
             raise HTTPException(404, f"Draft with id: {draft_id} not found")
-        db_draft.title = draft.title or db_draft.title
-        db_draft.body = draft.body or db_draft.body
+        await bump_watermarks(db, drafts_scope(user.id))
         await db.commit()
-        await db.refresh(db_draft)
-        return db_draft
+        return model_response(schemas.DraftDetail, db_draft)
     except Exception as exc:
         await db.rollback()
         raise HTTPException(401, "draft could not be updated") from exc
 
 
+@draft_router.put(
+    "/{draft_id}/autosave", response_model=schemas.DraftSaved, status_code=200
+)
+async def autosave_draft(
+    request: Request,
+    draft_id: int = Path(...),
+    draft: schemas.DraftAutosave = Body(...),
+    user: User = Depends(current_user),
+):
+    saved = await draft_autosaver.save(
+        draft_id, user.id, draft.version, draft.title, draft.body
+    )
+    key = writer_key(request)
+    if read_sessions and key is not None:
+        mark_write(key)
+    return model_response(schemas.DraftSaved, saved)
+
+
 @draft_router.delete("/{draft_id}", status_code=204)
 async def delete_draft(
     draft_id: str = Path(...),
@@ -89,6 +213,7 @@ async def delete_draft(
         if db_draft is None:
             raise HTTPException(404, f"Draft with id: {draft_id} not found")
         await db.delete(db_draft)
+        await bump_watermarks(db, drafts_scope(user.id))
         await db.commit()
         return
     except Exception as exc:
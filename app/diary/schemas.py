@@ -1,4 +1,5 @@
 from datetime import datetime
+from typing import Optional
 
 from pydantic import BaseModel, ConfigDict
 
@@ -11,15 +12,46 @@ class DraftIn(BaseModel):
 class DraftResponse(BaseModel):
     id: int
     title: str
-    body: str
+    excerpt: Optional[str]
+    body: Optional[str] = None
     created_at: datetime
     model_config = ConfigDict(from_attributes=True)
 
 
+class DraftPage(BaseModel):
+    items: list[DraftResponse]
+    next_cursor: Optional[str]
+
+
 class DraftDetail(BaseModel):
     id: int
     title: str
     body: str
+    version: int
     created_at: datetime
     updated_at: datetime
     model_config = ConfigDict(from_attributes=True)
+
+
+class DraftAutosave(BaseModel):
+    version: int
+    title: Optional[str] = None
+    body: Optional[str] = None
+
+
+class DraftSaved(BaseModel):
+    id: int
+    version: int
+    updated_at: datetime
+
+
+class DraftExport(BaseModel):
+    title: str
+    body: str
+    created_at: datetime
+    updated_at: Optional[datetime]
+    model_config = ConfigDict(from_attributes=True)
+
+
+class ImportResult(BaseModel):
+    imported: int
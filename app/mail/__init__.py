@@ -0,0 +1,3 @@
+from .models import EmailOutbox as EmailOutbox
+
+__all__ = ["EmailOutbox"]
@@ -0,0 +1,28 @@
+"""
+Run the email outbox worker as its own process:
+    python -m app.mail
+Set EMAIL_WORKER_IN_PROCESS=false so the web workers do not run it as well.
+"""
+
+import asyncio
+import signal
+
+from ..config.log import configure_logging
+from .worker import create_worker
+
+
+async def main():
+    log_listener = configure_logging()
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+    worker = create_worker()
+    if worker is not None:
+        await worker.run(stop)
+    if log_listener is not None:
+        log_listener.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,37 @@
+from datetime import datetime, timezone
+
+from sqlalchemy import Column, DateTime, Index, Integer, String, func
+
+from ..config import Base
+
+
+def utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+class EmailOutbox(Base):
+    """
+    Model to store `emails` waiting to be delivered.
+    - Rows are added in the same transaction as the change that triggers the email.
+    - The outbox worker sends due rows and retries failures with backoff.
+    - status is one of "pending", "sending" (claimed by a worker), "sent" or "failed".
+    """
+
+    __tablename__ = "email_outbox"
+
+    id = Column(Integer, primary_key=True)
+    sender = Column(String(250))
+    recipient = Column(String(250))
+    subject = Column(String(250))
+    body = Column(String)
+    content_type = Column(String(20), default="html")
+    status = Column(String(20), default="pending")
+    attempts = Column(Integer, default=0)
+    last_error = Column(String, nullable=True)
+    next_attempt_at = Column(DateTime, default=utcnow)
+    created_at = Column(DateTime, server_default=func.now())
+    sent_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        Index("ix_email_outbox_status_next_attempt_at", "status", "next_attempt_at"),
+    )
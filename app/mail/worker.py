@@ -0,0 +1,248 @@
+import asyncio
+import logging
+from datetime import timedelta
+from typing import TYPE_CHECKING, Optional
+
+from sqlalchemy import update
+from sqlalchemy.sql import select
+
+from ..config import global_config
+from ..config.db import async_session
+from .models import EmailOutbox, utcnow
+
+if TYPE_CHECKING:
+    import smtplib
+
+logger = logging.getLogger(__name__)
+
+
+class SMTPConnectionPool:
+    """
+    Keeps up to `size` logged-in SMTP connections open and reuses them.
+    - smtplib is blocking, so every call runs in a worker thread.
+    - A connection the server dropped is reopened once before failing the send.
+    - A connection whose send failed is closed, never put back in the pool.
+    - smtplib is imported on the first send, not at startup.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        user: Optional[str] = None,
+        password: Optional[str] = None,
+        use_tls: bool = True,
+        size: int = 2,
+        timeout: float = 30,
+    ):
+        self.host = host
+        self.port = port
+        self.user = user
+        self.password = password
+        self.use_tls = use_tls
+        self.timeout = timeout
+        self._idle: asyncio.Queue = asyncio.Queue()
+        self._slots = asyncio.Semaphore(size)
+
+    def _connect(self) -> "smtplib.SMTP":
+        import smtplib
+
+        server = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        try:
+            if self.use_tls:
+                server.starttls()
+            if self.user and self.password:
+                server.login(self.user, self.password)
+        except Exception:
+            self._discard(server)
+            raise
+        return server
+
+    def _sendmail(self, server: "smtplib.SMTP", sender, recipient, message):
+        try:
+            server.sendmail(sender, recipient, message)
+        except Exception:
+            self._discard(server)
+            raise
+
+    def _send(self, server: Optional["smtplib.SMTP"], sender, recipient, message):
+        import smtplib
+
+        if server is not None:
+            try:
+                self._sendmail(server, sender, recipient, message)
+                return server
+            except smtplib.SMTPServerDisconnected:
+                pass
+        server = self._connect()
+        self._sendmail(server, sender, recipient, message)
+        return server
+
+    async def send(self, sender: str, recipient: str, message: str):
+        async with self._slots:
+            server = None if self._idle.empty() else self._idle.get_nowait()
+            server = await asyncio.to_thread(
+                self._send, server, sender, recipient, message
+            )
+            self._idle.put_nowait(server)
+
+    @staticmethod
+    def _discard(server: "smtplib.SMTP"):
+        try:
+            server.quit()
+        except Exception:
+            server.close()
+
+    async def close(self):
+        while not self._idle.empty():
+            await asyncio.to_thread(self._discard, self._idle.get_nowait())
+
+
+def build_message(email: EmailOutbox) -> str:
+    from email.mime.multipart import MIMEMultipart
+    from email.mime.text import MIMEText
+
+    message = MIMEMultipart()
+    message["From"] = email.sender
+    message["To"] = email.recipient
+    message["Subject"] = email.subject
+    message.attach(MIMEText(email.body, email.content_type))
+    return message.as_string()
+
+
+class OutboxWorker:
+    """
+    Delivers `EmailOutbox` rows in batches over pooled SMTP connections.
+    - A batch is claimed with one `UPDATE ... RETURNING` that marks it "sending"
+      with a lease of `lease` seconds and commits, so no lock is held while
+      sending and each row goes to one worker only, on SQLite too.
+    - Rows whose lease ran out (worker crashed mid-send) are claimed again.
+    - Results are written back in a second short transaction.
+    - Failed sends are retried after `backoff * 2 ** attempts` seconds.
+    - After `max_attempts` failures a row is marked "failed" and left for inspection.
+    """
+
+    def __init__(
+        self,
+        pool: SMTPConnectionPool,
+        batch_size: int = 50,
+        max_attempts: int = 5,
+        backoff: float = 30,
+        poll_interval: float = 2,
+        lease: float = 300,
+    ):
+        self.pool = pool
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.poll_interval = poll_interval
+        self.lease = lease
+
+    async def _deliver(self, email: EmailOutbox) -> dict:
+        result = {
+            "id": email.id,
+            "status": "sent",
+            "attempts": email.attempts,
+            "last_error": email.last_error,
+            "next_attempt_at": email.next_attempt_at,
+            "sent_at": None,
+        }
+        try:
+            await self.pool.send(email.sender, email.recipient, build_message(email))
+        except Exception as exc:
+            result["attempts"] += 1
+            result["last_error"] = str(exc)[:500]
+            if result["attempts"] >= self.max_attempts:
+                result["status"] = "failed"
+                logger.error(
+                    "Giving up on email %s to %s: %s", email.id, email.recipient, exc
+                )
+            else:
+                delay = self.backoff * 2 ** (result["attempts"] - 1)
+                result["status"] = "pending"
+                result["next_attempt_at"] = utcnow() + timedelta(seconds=delay)
+                logger.warning(
+                    "Email %s failed, retrying in %ss: %s", email.id, delay, exc
+                )
+            return result
+        result["sent_at"] = utcnow()
+        logger.info("Email sent to %s", email.recipient)
+        return result
+
+    async def claim(self) -> list[EmailOutbox]:
+        now = utcnow()
+        due = (
+            EmailOutbox.status.in_(("pending", "sending")),
+            EmailOutbox.next_attempt_at <= now,
+        )
+        batch = (
+            select(EmailOutbox.id)
+            .filter(*due)
+            .order_by(EmailOutbox.id)
+            .limit(self.batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        async with async_session() as session:
+            # The conditions are checked again by the UPDATE itself, so of two
+            # workers racing for the same rows only the first one gets them.
+            result = await session.execute(
+                update(EmailOutbox)
+                .where(EmailOutbox.id.in_(batch), *due)
+                .values(
+                    status="sending",
+                    next_attempt_at=now + timedelta(seconds=self.lease),
+                )
+                .returning(EmailOutbox)
+                .execution_options(synchronize_session=False)
+            )
+            emails = result.scalars().all()
+            await session.commit()
+        return emails
+
+    async def process_batch(self) -> int:
+        emails = await self.claim()
+        if not emails:
+            return 0
+        results = await asyncio.gather(*(self._deliver(email) for email in emails))
+        async with async_session() as session:
+            await session.execute(update(EmailOutbox), results)
+            await session.commit()
+        return len(emails)
+
+    async def run(self, stop: asyncio.Event):
+        try:
+            while not stop.is_set():
+                try:
+                    processed = await self.process_batch()
+                except Exception as exc:
+                    logger.error("Email outbox batch failed: %s", exc)
+                    processed = 0
+                if processed < self.batch_size:
+                    try:
+                        await asyncio.wait_for(stop.wait(), self.poll_interval)
+                    except asyncio.TimeoutError:
+                        pass
+        finally:
+            await self.pool.close()
+
+
+def create_worker() -> Optional[OutboxWorker]:
+    if not global_config.EMAIL_SERVER:
+        logger.warning("EMAIL_SERVER is not set, outbox emails will stay pending")
+        return None
+    pool = SMTPConnectionPool(
+        host=global_config.EMAIL_SERVER,
+        port=int(global_config.EMAIL_PORT or 587),
+        user=global_config.EMAIL_USER,
+        password=global_config.EMAIL_PASSWORD,
+        use_tls=global_config.EMAIL_USE_TLS,
+        size=global_config.EMAIL_POOL_SIZE,
+    )
+    return OutboxWorker(
+        pool,
+        batch_size=global_config.EMAIL_BATCH_SIZE,
+        max_attempts=global_config.EMAIL_MAX_ATTEMPTS,
+        backoff=global_config.EMAIL_RETRY_BACKOFF,
+        poll_interval=global_config.EMAIL_POLL_INTERVAL,
+        lease=global_config.EMAIL_SEND_LEASE,
+    )
@@ -7,14 +7,18 @@ from fastapi.exception_handlers import http_exception_handler
 sys.dont_write_bytecode = True
 
 from .auth import auth_router
-from .config import lifespan
+from .common import FastJSONResponse
+from .config import check_database, engine, lifespan, pool_stats
+from .config.db import read_engines
 from .diary import draft_router
+from .metrics import MetricsMiddleware, instrument_engine, metrics_router
 from .posts import post_router
 
 logger = logging.getLogger()
 
 app = FastAPI(
     lifespan=lifespan,
+    default_response_class=FastJSONResponse,
     title="FastAPI-based API's to manage Blogs",
     terms_of_service="https://github.com/biradar8/BlogpostProject",
 )
@@ -24,6 +28,10 @@ logger.info("Application startup completed")
 app.include_router(auth_router, prefix="/api")
 app.include_router(post_router, prefix="/api")
 app.include_router(draft_router, prefix="/api")
+app.include_router(metrics_router)
+app.add_middleware(MetricsMiddleware)
+for db_engine in (engine, *read_engines):
+    instrument_engine(db_engine)
 
 
 @app.get("/")
@@ -31,7 +39,15 @@ def home():
     return {"Hello": "World"}
 
 
+@app.get("/ready")
+async def ready():
+    pool = pool_stats(engine)
+    database = await check_database(engine)
+    content = {"database": "ok" if database else "unavailable", "pool": pool}
+    return FastJSONResponse(content, status_code=200 if database else 503)
+
+
 @app.exception_handler(HTTPException)
 async def http_exception_handle_logging(request, exc: HTTPException):
-    logger.error(f"Exception: status_code={exc.status_code}, detail={exc.detail}")
+    logger.error("Exception: status_code=%s, detail=%s", exc.status_code, exc.detail)
     return await http_exception_handler(request, exc)
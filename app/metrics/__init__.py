@@ -0,0 +1,5 @@
+from .middleware import MetricsMiddleware as MetricsMiddleware
+from .queries import instrument_engine as instrument_engine
+from .router import metrics_router as metrics_router
+
+__all__ = ["MetricsMiddleware", "instrument_engine", "metrics_router"]
@@ -0,0 +1,89 @@
+import logging
+import time
+import uuid
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from ..config.log import request_id
+from .queries import RequestQueries, current_queries
+from .registry import (
+    db_duration,
+    db_queries,
+    request_duration,
+    requests_in_flight,
+    requests_total,
+)
+
+access_logger = logging.getLogger("app.access")
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware recording latency, status and database use per route.
+    - Routes are labelled by their path template, so `/api/blog/{blog_slug}`
+      is one series however many slugs are read.
+    - Adds a `Server-Timing` header splitting database time from the rest.
+    - Sets the request id used in logs from `X-Request-ID`, or a new one, and
+      echoes it back; with LOG_ACCESS each request is logged with its latency.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        start = time.perf_counter()
+        queries = RequestQueries()
+        token = current_queries.set(queries)
+        rid = dict(scope["headers"]).get(b"x-request-id", b"").decode("latin-1")
+        rid = rid[:64] or uuid.uuid4().hex[:16]
+        rid_token = request_id.set(rid)
+        status = 500
+
+        async def send_with_timing(message: Message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                db_ms = queries.seconds * 1000
+                total_ms = (time.perf_counter() - start) * 1000
+                timing = (
+                    f'db;dur={db_ms:.2f};desc="{queries.count} queries", '
+                    f"total;dur={total_ms:.2f}"
+                )
+                message["headers"] = [
+                    *message.get("headers", []),
+                    (b"server-timing", timing.encode()),
+                    (b"x-request-id", rid.encode("latin-1")),
+                ]
+            await send(message)
+
+        requests_in_flight.inc(amount=1)
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            requests_in_flight.inc(amount=-1)
+            current_queries.reset(token)
+            elapsed = time.perf_counter() - start
+            route = scope.get("route")
+            labels = (scope["method"], getattr(route, "path", "unmatched"))
+            requests_total.inc(*labels, str(status))
+            request_duration.observe(*labels, value=elapsed)
+            db_queries.inc(*labels, amount=queries.count)
+            db_duration.observe(*labels, value=queries.seconds)
+            if access_logger.isEnabledFor(logging.INFO):
+                access_logger.info(
+                    "%s %s %s %.2fms",
+                    scope["method"],
+                    scope["path"],
+                    status,
+                    elapsed * 1000,
+                    extra={
+                        "method": scope["method"],
+                        "path": scope["path"],
+                        "status": status,
+                        "latency_ms": round(elapsed * 1000, 2),
+                    },
+                )
+            request_id.reset(rid_token)
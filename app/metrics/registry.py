@@ -0,0 +1,135 @@
+import bisect
+from collections import defaultdict
+from typing import Iterable
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+
+def escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def format_labels(names: tuple[str, ...], values: tuple) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{escape(value)}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+class Counter:
+    """Monotonic counter keyed by label values, rendered in Prometheus text format."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, description: str, labels: tuple[str, ...] = ()):
+        self.name = name
+        self.description = description
+        self.labels = labels
+        self.values: defaultdict[tuple, float] = defaultdict(float)
+
+    def inc(self, *label_values, amount: float = 1):
+        self.values[label_values] += amount
+
+    def samples(self) -> Iterable[str]:
+        for label_values, value in sorted(self.values.items()):
+            yield f"{self.name}{format_labels(self.labels, label_values)} {value}"
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, *label_values, value: float):
+        self.values[label_values] = value
+
+
+class Histogram:
+    """
+    Fixed bucket histogram keyed by label values.
+    - Buckets are cumulative on output, as Prometheus expects.
+    """
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        labels: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+    ):
+        self.name = name
+        self.description = description
+        self.labels = labels
+        self.buckets = buckets
+        self.counts: dict[tuple, list[int]] = {}
+        self.sums: defaultdict[tuple, float] = defaultdict(float)
+
+    def observe(self, *label_values, value: float):
+        counts = self.counts.get(label_values)
+        if counts is None:
+            counts = self.counts[label_values] = [0] * (len(self.buckets) + 1)
+        counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sums[label_values] += value
+
+    def samples(self) -> Iterable[str]:
+        for label_values, counts in sorted(self.counts.items()):
+            names = self.labels + ("le",)
+            total = 0
+            for bound, count in zip((*self.buckets, "+Inf"), counts):
+                total += count
+                labels = format_labels(names, label_values + (bound,))
+                yield f"{self.name}_bucket{labels} {total}"
+            labels = format_labels(self.labels, label_values)
+            yield f"{self.name}_sum{labels} {self.sums[label_values]}"
+            yield f"{self.name}_count{labels} {total}"
+
+
+class Registry:
+    def __init__(self):
+        self.metrics: list = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self.metrics:
+            lines.append(f"# HELP {metric.name} {metric.description}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+requests_total = registry.register(
+    Counter(
+        "http_requests_total",
+        "Requests handled, by route and status code.",
+        ("method", "route", "status"),
+    )
+)
+request_duration = registry.register(
+    Histogram(
+        "http_request_duration_seconds",
+        "Time from receiving a request to sending its last body chunk.",
+        ("method", "route"),
+    )
+)
+requests_in_flight = registry.register(
+    Gauge("http_requests_in_flight", "Requests currently being handled.")
+)
+db_queries = registry.register(
+    Counter(
+        "db_queries_total",
+        "SQL statements executed, by the route that ran them.",
+        ("method", "route"),
+    )
+)
+db_duration = registry.register(
+    Histogram(
+        "db_request_duration_seconds",
+        "Database time spent per request.",
+        ("method", "route"),
+    )
+)
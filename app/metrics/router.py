@@ -0,0 +1,79 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from ..auth.hashing import hashing_pool
+from ..auth.ratelimit import limiters
+from ..auth.utils import user_cache
+from ..config import engine, pool_stats
+from ..config.db import read_engines
+from ..posts.cache import detail_cache
+from ..posts.comments import comment_buffer
+from ..posts.snapshot import front_page
+from ..posts.views import view_counter
+from .queries import background_queries
+from .registry import Gauge, registry
+
+metrics_router = APIRouter(tags=["Metrics"])
+PROMETHEUS_MEDIA_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+hashing_stats = registry.register(
+    Gauge("hashing_pool", "bcrypt worker pool counters.", ("stat",))
+)
+cache_stats = registry.register(
+    Gauge("cache", "In-process cache counters.", ("cache", "stat"))
+)
+rate_limit_stats = registry.register(
+    Gauge(
+        "rate_limit", "Requests allowed and rejected per limiter.", ("limiter", "stat")
+    )
+)
+comment_buffer_stats = registry.register(
+    Gauge("comment_buffer", "Buffered comment writes.", ("stat",))
+)
+front_page_stats = registry.register(
+    Gauge("front_page_snapshot", "Pre-serialized front page pages.", ("stat",))
+)
+view_counter_stats = registry.register(
+    Gauge("view_counter", "Post views counted but not yet written.", ("stat",))
+)
+db_pool_stats = registry.register(
+    Gauge("db_pool", "Database connection pool counters.", ("engine", "stat"))
+)
+background_stats = registry.register(
+    Gauge(
+        "db_background_queries",
+        "SQL run outside any request, e.g. by the outbox worker.",
+        ("stat",),
+    )
+)
+
+
+def collect():
+    for stat, value in hashing_pool.stats().items():
+        if stat != "kind":
+            hashing_stats.set(stat, value=value)
+    for name, cache in (("user", user_cache), ("post_detail", detail_cache)):
+        for stat, value in cache.stats().items():
+            cache_stats.set(name, stat, value=value)
+    for name, limiter in limiters.items():
+        for stat, value in limiter.stats().items():
+            rate_limit_stats.set(name, stat, value=value)
+    for stat, value in comment_buffer.stats().items():
+        comment_buffer_stats.set(stat, value=value)
+    for stat, value in front_page.stats().items():
+        front_page_stats.set(stat, value=value)
+    for stat, value in view_counter.stats().items():
+        view_counter_stats.set(stat, value=value)
+    engines = [("primary", engine)]
+    engines += [(f"replica{i}", replica) for i, replica in enumerate(read_engines)]
+    for name, db_engine in engines:
+        for stat, value in pool_stats(db_engine).items():
+            db_pool_stats.set(name, stat, value=value)
+    background_stats.set("queries", value=background_queries.count)
+    background_stats.set("seconds", value=background_queries.seconds)
+
+
+@metrics_router.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    collect()
+    return PlainTextResponse(registry.render(), media_type=PROMETHEUS_MEDIA_TYPE)
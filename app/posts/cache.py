@@ -0,0 +1,29 @@
+import zlib
+from typing import Optional
+
+from fastapi import Request, Response
+
+from ..common import TTLCache, etag_matches
+from ..config import global_config
+from .snapshot import front_page
+
+detail_cache = TTLCache(global_config.POST_CACHE_SIZE, global_config.POST_CACHE_TTL)
+
+
+def detail_etag(post, content: bytes) -> str:
+    # updated_at has second resolution on SQLite, the checksum separates edits
+    # (or new comments) that land within the same second.
+    updated_at = post.updated_at or post.created_at
+    return f'"{post.id}-{int(updated_at.timestamp())}-{zlib.crc32(content):08x}"'
+
+
+def cached_response(request: Request, etag: str, content: bytes) -> Response:
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    return Response(content, media_type="application/json", headers={"ETag": etag})
+
+
+def invalidate_post(slug: Optional[str]):
+    front_page.mark_dirty()
+    if slug is not None:
+        detail_cache.invalidate(slug)
@@ -0,0 +1,160 @@
+import asyncio
+import logging
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+
+from fastapi import HTTPException
+from sqlalchemy import case, insert, select, update
+
+from ..config import global_config
+from ..config.db import async_session
+from ..config.watermark import bump_watermarks, posts_scope
+from .cache import invalidate_post
+from .models import Comment, Post
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PendingComment:
+    row: dict
+    slug: str
+    saved: asyncio.Future = field(
+        default_factory=lambda: asyncio.get_running_loop().create_future()
+    )
+
+    def fail(self, exc: Exception):
+        if not self.saved.done():
+            self.saved.set_exception(exc)
+            self.saved.exception()  # the request may be gone; don't log it twice
+
+
+class CommentBuffer:
+    """
+    Collects new comments in memory and writes them in one transaction per flush.
+    - Flushes every `flush_interval` seconds, or as soon as `batch_size` wait.
+    - Each flush is multi-row INSERTs plus one UPDATE of `comment_count` for
+      all posts in it, and invalidates each touched post's cache once.
+    - It bumps the watermarks of the post lists once per flush, not per comment.
+    - Holds at most `max_pending` comments; beyond that `add` answers 503.
+    - `add` returns once the comment is committed, so a 201 means it is stored.
+    """
+
+    def __init__(
+        self,
+        flush_interval: float = 0.2,
+        batch_size: int = 500,
+        max_pending: int = 10000,
+    ):
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.max_pending = max_pending
+        self._pending: list[PendingComment] = []
+        self._full = asyncio.Event()
+        self.flushes = 0
+        self.written = 0
+        self.rejected = 0
+
+    async def add(self, post_id: int, slug: str, user_id: int, message: str) -> dict:
+        if len(self._pending) >= self.max_pending:
+            self.rejected += 1
+            raise HTTPException(503, "Server busy, try again", {"Retry-After": "1"})
+        row = {
+            "post_id": post_id,
+            "user_id": user_id,
+            "message": message,
+            "created_at": datetime.now(timezone.utc).replace(tzinfo=None),
+        }
+        pending = PendingComment(row, slug)
+        self._pending.append(pending)
+        if len(self._pending) >= self.batch_size:
+            self._full.set()
+        await asyncio.shield(pending.saved)
+        return row
+
+    async def flush(self) -> int:
+        if not self._pending:
+            return 0
+        batch, self._pending = self._pending, []
+        self._full.clear()
+        try:
+            async with async_session() as session:
+                post_ids = {pending.row["post_id"] for pending in batch}
+                result = await session.execute(
+                    select(Post.id, Post.user_id).where(Post.id.in_(post_ids))
+                )
+                authors = dict(result.all())
+                existing = set(authors)
+                gone = [p for p in batch if p.row["post_id"] not in existing]
+                batch = [p for p in batch if p.row["post_id"] in existing]
+                for pending in gone:
+                    pending.fail(
+                        HTTPException(404, f"Post with slug: {pending.slug} not found")
+                    )
+                for start in range(0, len(batch), self.batch_size):
+                    chunk = batch[start : start + self.batch_size]
+                    await session.execute(
+                        insert(Comment).values([pending.row for pending in chunk])
+                    )
+                counts = Counter(pending.row["post_id"] for pending in batch)
+                if counts:
+                    await session.execute(
+                        update(Post)
+                        .where(Post.id.in_(counts))
+                        .values(
+                            comment_count=Post.comment_count
+                            + case(counts, value=Post.id)
+                        )
+                        .execution_options(synchronize_session=False)
+                    )
+                    # comment_count is part of every post list.
+                    await bump_watermarks(
+                        session,
+                        posts_scope(),
+                        *(posts_scope(authors[post_id]) for post_id in counts),
+                    )
+                await session.commit()
+        except Exception as exc:
+            logger.error("Flushing %d comments failed: %s", len(batch), exc)
+            error = HTTPException(503, "Comment could not be saved, try again")
+            for pending in batch:
+                pending.fail(error)
+            return 0
+        for slug in {pending.slug for pending in batch}:
+            invalidate_post(slug)
+        for pending in batch:
+            pending.saved.set_result(None)
+        self.flushes += 1
+        self.written += len(batch)
+        return len(batch)
+
+    async def run(self, stop: asyncio.Event):
+        while not stop.is_set():
+            wake = asyncio.create_task(self._full.wait())
+            halt = asyncio.create_task(stop.wait())
+            await asyncio.wait(
+                (wake, halt),
+                timeout=self.flush_interval,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            wake.cancel()
+            halt.cancel()
+            await self.flush()
+        await self.flush()
+
+    def stats(self) -> dict:
+        return {
+            "pending": len(self._pending),
+            "max_pending": self.max_pending,
+            "flushes": self.flushes,
+            "written": self.written,
+            "rejected": self.rejected,
+        }
+
+
+comment_buffer = CommentBuffer(
+    flush_interval=global_config.COMMENT_FLUSH_INTERVAL,
+    batch_size=global_config.COMMENT_BATCH_SIZE,
+    max_pending=global_config.COMMENT_BUFFER_SIZE,
+)
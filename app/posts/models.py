@@ -1,4 +1,15 @@
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, func
+from sqlalchemy import (
+    Column,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    LargeBinary,
+    String,
+    event,
+    func,
+    update,
+)
 from sqlalchemy.orm import relationship
 
 from ..config import Base
@@ -9,6 +20,8 @@ class Post(Base):
     Model to store `Blogs` posted to public.
     - Only owner of post can edit or delete post.
     - Anyone with or without a account can view posts.
+    - excerpt is a short plain-text prefix of body, computed on every write.
+    - comment_count is kept in step with `comments` inserts and deletes.
     - contain relationship to:
       - author = relationship("User", back_populates="posts")
     """
@@ -19,11 +32,19 @@ class Post(Base):
     slug = Column(String, unique=True, index=True)
     title = Column(String(250))
     body = Column(String)
+    excerpt = Column(String, nullable=True)
     user_id = Column(Integer, ForeignKey("users.id"))
+    comment_count = Column(Integer, default=0, server_default="0", nullable=False)
     created_at = Column(DateTime, server_default=func.now())
     updated_at = Column(DateTime, server_default=func.now(), server_onupdate=func.now())
     author = relationship("User", back_populates="posts")
     comments = relationship("Comment", back_populates="post")
+    stats = relationship("PostStats", uselist=False, viewonly=True)
+
+    __table_args__ = (
+        Index("ix_posts_created_at_id", "created_at", "id"),
+        Index("ix_posts_user_id_created_at_id", "user_id", "created_at", "id"),
+    )
 
 
 class Comment(Base):
@@ -44,3 +65,46 @@ class Comment(Base):
     created_at = Column(DateTime, server_default=func.now())
     author = relationship("User")
     post = relationship("Post", back_populates="comments")
+
+    __table_args__ = (
+        Index("ix_comments_post_id_created_at_id", "post_id", "created_at", "id"),
+    )
+
+
+class PostStats(Base):
+    """
+    Model to store view statistics of a `Blog`, written in batches by the view counter.
+    - views counts every detail read.
+    - sketch is a HyperLogLog of viewers; unique_viewers is its estimate,
+      stored so listings don't decode sketches.
+    - slug is copied from the post so "most viewed" reads only this table.
+    """
+
+    __tablename__ = "post_stats"
+
+    post_id = Column(Integer, ForeignKey("posts.id"), primary_key=True)
+    slug = Column(String, nullable=False)
+    views = Column(Integer, default=0, server_default="0", nullable=False)
+    unique_viewers = Column(Integer, default=0, server_default="0", nullable=False)
+    sketch = Column(LargeBinary, nullable=False)
+    updated_at = Column(DateTime, server_default=func.now())
+
+    __table_args__ = (Index("ix_post_stats_views", "views"),)
+
+
+def change_comment_count(connection, post_id: int, delta: int):
+    connection.execute(
+        update(Post)
+        .where(Post.id == post_id)
+        .values(comment_count=Post.comment_count + delta)
+    )
+
+
+@event.listens_for(Comment, "after_insert")
+def increment_comment_count(mapper, connection, target):
+    change_comment_count(connection, target.post_id, 1)
+
+
+@event.listens_for(Comment, "after_delete")
+def decrement_comment_count(mapper, connection, target):
+    change_comment_count(connection, target.post_id, -1)
@@ -1,55 +1,342 @@
 import logging
 import re
+import uuid
+from typing import Optional, Union
 
-from fastapi import APIRouter, Body, Depends, HTTPException, Path, Query
+from fastapi import APIRouter, Body, Depends, HTTPException, Path, Query, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy import delete, func, insert, update
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import joinedload
 from sqlalchemy.sql import select
 
 from ..auth import User, current_user
-from ..config import get_db
+from ..auth.ratelimit import client_ip
+from ..common import (
+    NDJSON_MEDIA_TYPE,
+    FastJSONResponse,
+    keyset_page,
+    make_excerpt,
+    model_response,
+    next_cursor,
+    not_modified,
+    read_ndjson,
+    select_fields,
+    serialize,
+    stream_ndjson,
+)
+from ..config import engine, get_db, get_read_db, global_config, read_sessionmaker
+from ..config.db import mark_write, read_sessions, recent_writer, writer_key
+from ..config.watermark import bump_watermarks, posts_scope, read_watermark
 from . import schemas
-from .models import Comment, Post
+from .cache import cached_response, detail_cache, detail_etag, invalidate_post
+from .comments import comment_buffer
+from .models import Comment, Post, PostStats
+from .search import search_query
+from .snapshot import front_page
+from .views import view_counter
 
 post_router = APIRouter(prefix="/blog", tags=["Blog"])
 logger = logging.getLogger(__name__)
 
 
-@post_router.get("/", response_model=list[schemas.PostList], status_code=200)
+def list_columns(fields: Optional[str]) -> list:
+    columns = [
+        Post.id,
+        Post.title,
+        Post.slug,
+        Post.excerpt,
+        Post.comment_count,
+        Post.created_at,
+    ]
+    return select_fields(columns, {"body": Post.body}, fields)
+
+
+async def list_page(
+    db: AsyncSession,
+    query,
+    skip: int,
+    limit: int,
+    cursor: Optional[str],
+    headers: dict[str, str],
+):
+    if cursor is not None:
+        result = await db.execute(keyset_page(query, Post, cursor, limit))
+        posts = result.all()
+        page = {"items": posts[:limit], "next_cursor": next_cursor(posts, limit)}
+        return model_response(
+            schemas.PostPage, page, exclude_unset=True, headers=headers
+        )
+    result = await db.execute(query.offset(skip).limit(limit))
+    return model_response(
+        list[schemas.PostList], result.all(), exclude_unset=True, headers=headers
+    )
+
+
+# GET routes declared before /{blog_slug} answer these paths instead of it.
+RESERVED_SLUGS = {"export", "most-viewed", "search"}
+
+
+def slugify(title: str) -> str:
+    slug = re.sub(r"\s+", "-", title.lower())
+    slug = re.sub(r"[^\w\-]", "", slug)
+    return f"{slug}-post" if slug in RESERVED_SLUGS else slug
+
+
+@post_router.get(
+    "/",
+    response_model=Union[list[schemas.PostList], schemas.PostPage],
+    response_model_exclude_unset=True,
+    status_code=200,
+)
 async def list_posts(
-    skip: int = Query(0), limit: int = Query(10), db: AsyncSession = Depends(get_db)
+    request: Request,
+    skip: int = Query(0),
+    limit: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = Query(None),
+    fields: Optional[str] = Query(None),
+    db: AsyncSession = Depends(get_read_db),
 ):
-    result = await db.execute(select(Post).offset(skip).limit(limit))
-    return result.scalars().all()
+    if cursor is None and fields is None:
+        snapshot = front_page.get(skip, limit)
+        if snapshot is not None:
+            headers, content = snapshot
+            cached = not_modified(request, headers)
+            if cached is not None:
+                return cached
+            return FastJSONResponse(content, headers=headers)
+    query = select(*list_columns(fields))
+    headers = (await read_watermark(db, posts_scope())).headers()
+    cached = not_modified(request, headers)
+    if cached is not None:
+        return cached
+    return await list_page(db, query, skip, limit, cursor, headers)
 
 
-@post_router.get("/posts/", response_model=list[schemas.PostList], status_code=200)
+@post_router.get(
+    "/posts/",
+    response_model=Union[list[schemas.PostList], schemas.PostPage],
+    response_model_exclude_unset=True,
+    status_code=200,
+)
 async def list_posts_for_author(
+    request: Request,
+    skip: int = Query(0),
+    limit: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = Query(None),
+    fields: Optional[str] = Query(None),
+    db: AsyncSession = Depends(get_read_db),
+    user: User = Depends(current_user),
+):
+    query = select(*list_columns(fields)).filter(Post.user_id == user.id)
+    headers = (await read_watermark(db, posts_scope(user.id))).headers(private=True)
+    cached = not_modified(request, headers)
+    if cached is not None:
+        return cached
+    return await list_page(db, query, skip, limit, cursor, headers)
+
+
+@post_router.get(
+    "/search",
+    response_model=list[schemas.PostList],
+    response_model_exclude_unset=True,
+    status_code=200,
+)
+async def search_posts(
+    q: str = Query(..., min_length=1),
     skip: int = Query(0),
-    limit: int = Query(10),
+    limit: int = Query(10, ge=1, le=100),
+    fields: Optional[str] = Query(None),
+    db: AsyncSession = Depends(get_read_db),
+):
+    columns = list_columns(fields)
+    q = q.strip()
+    if not q:
+        # An empty FTS5 MATCH is a syntax error; no terms matches nothing.
+        return model_response(list[schemas.PostList], [])
+    query = search_query(db.bind.dialect.name, q, columns)
+    result = await db.execute(query.offset(skip).limit(limit))
+    return model_response(list[schemas.PostList], result.all(), exclude_unset=True)
+
+
+@post_router.get("/export", response_class=StreamingResponse, status_code=200)
+async def export_posts(request: Request, user: User = Depends(current_user)):
+    query = (
+        select(Post.title, Post.body, Post.slug, Post.created_at, Post.updated_at)
+        .filter(Post.user_id == user.id)
+        .order_by(Post.id)
+    )
+    chunks = stream_ndjson(
+        read_sessionmaker(request),
+        query,
+        schemas.PostExport,
+        global_config.NDJSON_CHUNK_SIZE,
+    )
+    return StreamingResponse(chunks, media_type=NDJSON_MEDIA_TYPE)
+
+
+@post_router.post("/import", response_model=schemas.ImportResult, status_code=201)
+async def import_posts(
+    request: Request,
     db: AsyncSession = Depends(get_db),
     user: User = Depends(current_user),
+):
+    """
+    Create posts from an NDJSON body of `{"title": ..., "body": ...}` lines.
+    - Every chunk is one multi-row INSERT and is committed on its own.
+    - A slug already taken gets a random suffix instead of failing the chunk.
+    """
+    imported = 0
+    chunk_size = global_config.NDJSON_CHUNK_SIZE
+    try:
+        async for batch in read_ndjson(request, schemas.PostIn, chunk_size):
+            rows = [
+                {
+                    "title": post.title,
+                    "body": post.body,
+                    "slug": slugify(post.title),
+                    "excerpt": make_excerpt(post.body, global_config.EXCERPT_LENGTH),
+                    "user_id": user.id,
+                }
+                for post in batch
+            ]
+            result = await db.execute(
+                select(Post.slug).where(Post.slug.in_({row["slug"] for row in rows}))
+            )
+            taken = set(result.scalars())
+            for row in rows:
+                if row["slug"] in taken:
+                    row["slug"] = f"{row['slug']}-{uuid.uuid4().hex[:8]}"
+                taken.add(row["slug"])
+            await db.execute(insert(Post).values(rows))
+            await bump_watermarks(db, posts_scope(), posts_scope(user.id))
+            await db.commit()
+            front_page.mark_dirty()
+            imported += len(rows)
+    except HTTPException:
+        await db.rollback()
+        raise
+    except Exception as exc:
+        await db.rollback()
+        logger.error("Post import failed after %d posts : %s", imported, exc)
+        raise HTTPException(400, f"Import failed after {imported} posts") from exc
+    return model_response(schemas.ImportResult, {"imported": imported}, 201)
+
+
+@post_router.get(
+    "/most-viewed", response_model=list[schemas.PostViews], status_code=200
+)
+async def most_viewed_posts(
+    limit: int = Query(10, ge=1, le=100),
+    db: AsyncSession = Depends(get_read_db),
 ):
     result = await db.execute(
-        select(Post).filter_by(user_id=user.id).offset(skip).limit(limit)
+        select(PostStats.slug, PostStats.views, PostStats.unique_viewers)
+        .order_by(PostStats.views.desc())
+        .limit(limit)
     )
-    return result.scalars().all()
+    return model_response(list[schemas.PostViews], result.all())
 
 
 @post_router.get("/{blog_slug}", response_model=schemas.PostDetail, status_code=200)
-async def detail_post(blog_slug: str = Path(...), db: AsyncSession = Depends(get_db)):
+async def detail_post(
+    request: Request,
+    blog_slug: str = Path(...),
+    db: AsyncSession = Depends(get_read_db),
+):
+    viewer = f"{client_ip(request)}|{request.headers.get('user-agent', '')}"
+    # A client that just wrote may be on a worker whose cache predates its write.
+    cached = None if recent_writer(request) else detail_cache.get(blog_slug)
+    if cached is not None:
+        view_counter.record(blog_slug, viewer)
+        return cached_response(request, *cached)
     result = await db.execute(
         select(Post)
-        .options(
-            selectinload(Post.author),
-            selectinload(Post.comments).selectinload(Comment.author),
-        )
+        .options(joinedload(Post.author), joinedload(Post.stats))
         .filter_by(slug=blog_slug)
     )
     post = result.scalar_one_or_none()
     if post is None:
         raise HTTPException(404, f"Post with slug: {blog_slug} not found")
-    return post
+    view_counter.record(blog_slug, viewer)
+    limit = global_config.COMMENTS_IN_DETAIL
+    query = (
+        select(Comment).options(joinedload(Comment.author)).filter_by(post_id=post.id)
+    )
+    result = await db.execute(keyset_page(query, Comment, "", limit, descending=False))
+    comments = result.scalars().all()
+    content = serialize(
+        schemas.PostDetail,
+        {
+            "title": post.title,
+            "body": post.body,
+            "author": post.author,
+            "created_at": post.created_at,
+            "comment_count": post.comment_count,
+            "views": post.stats.views if post.stats else 0,
+            "unique_viewers": post.stats.unique_viewers if post.stats else 0,
+            "comments": comments[:limit],
+            "comments_next_cursor": next_cursor(comments, limit),
+        },
+    )
+    etag = detail_etag(post, content)
+    # A lagging replica could put the pre-update post back for the whole TTL.
+    if db.bind is engine:
+        detail_cache.set(blog_slug, (etag, content))
+    return cached_response(request, etag, content)
+
+
+@post_router.get(
+    "/{blog_slug}/comments", response_model=schemas.CommentPage, status_code=200
+)
+async def list_comments(
+    blog_slug: str = Path(...),
+    cursor: str = Query(""),
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_read_db),
+):
+    post_id = select(Post.id).filter_by(slug=blog_slug).scalar_subquery()
+    query = (
+        select(Comment)
+        .options(joinedload(Comment.author))
+        .filter(Comment.post_id == post_id)
+    )
+    result = await db.execute(
+        keyset_page(query, Comment, cursor, limit, descending=False)
+    )
+    comments = result.scalars().all()
+    if not comments and not cursor:
+        post = await db.execute(select(Post.id).filter_by(slug=blog_slug))
+        if post.scalar_one_or_none() is None:
+            raise HTTPException(404, f"Post with slug: {blog_slug} not found")
+    page = {"items": comments[:limit], "next_cursor": next_cursor(comments, limit)}
+    return model_response(schemas.CommentPage, page)
+
+
+@post_router.post(
+    "/{blog_slug}/comments", response_model=schemas.CommentDetail, status_code=201
+)
+async def create_comment(
+    request: Request,
+    blog_slug: str = Path(...),
+    comment: schemas.Comment = Body(...),
+    db: AsyncSession = Depends(get_db),
+    user: User = Depends(current_user),
+):
+    # The primary, so a post created a moment ago is found even if replicas lag.
+    post_id = await db.scalar(select(Post.id).filter_by(slug=blog_slug))
+    if post_id is None:
+        raise HTTPException(404, f"Post with slug: {blog_slug} not found")
+    # Give the connection back while waiting, the flush needs one from the pool.
+    await db.close()
+    row = await comment_buffer.add(post_id, blog_slug, user.id, comment.message)
+    # The buffer commits in its own session; keep this client on the primary.
+    key = writer_key(request)
+    if read_sessions and key is not None:
+        mark_write(key)
+    return model_response(
+        schemas.CommentDetail, {**row, "author": user}, status_code=201
+    )
 
 
 @post_router.post("/", response_model=schemas.PostResponse, status_code=200)
@@ -59,16 +346,22 @@ async def create_post(
     auth_user: User = Depends(current_user),
 ):
     try:
-        db_post = Post(**post.model_dump())
-        db_post.user_id = auth_user.id
-        slug = re.sub(r"\s+", "-", db_post.title.lower())
-        db_post.slug = re.sub(r"[^\w\-]", "", slug)
-        db.add(db_post)
+        db_post = await db.scalar(
+            insert(Post)
+            .values(
+                **post.model_dump(),
+                user_id=auth_user.id,
+                slug=slugify(post.title),
+                excerpt=make_excerpt(post.body, global_config.EXCERPT_LENGTH),
+            )
+            .returning(Post)
+        )
+        await bump_watermarks(db, posts_scope(), posts_scope(auth_user.id))
         await db.commit()
-        await db.refresh(db_post)
-        return db_post
+        front_page.mark_dirty()
+        return model_response(schemas.PostResponse, db_post)
     except Exception as exc:
-        logger.error(f"{auth_user.full_name} failed to create a post : {str(exc)}")
+        logger.error("%s failed to create a post : %s", auth_user.full_name, exc)
 
 
 @post_router.patch("/{blog_id}", response_model=schemas.PostResponse, status_code=200)
@@ -79,18 +372,28 @@ async def update_post(
     user: User = Depends(current_user),
 ):
     try:
-        result = await db.execute(select(Post).filter_by(id=blog_id, user_id=user.id))
-        db_post = result.scalar_one_or_none()
+        values = {"updated_at": func.now()}
+        if post.title:
+            values["title"] = post.title
+        if post.body:
+            values["body"] = post.body
+            values["excerpt"] = make_excerpt(post.body, global_config.EXCERPT_LENGTH)
+        db_post = await db.scalar(
+            update(Post)
+            .where(Post.id == blog_id, Post.user_id == user.id)
+            .values(**values)
+            .returning(Post)
+            .execution_options(synchronize_session=False)
+        )
         if db_post is None:
             raise HTTPException(404, f"Post with id: {blog_id} not found")
-        db_post.body = post.body or db_post.body
-        db_post.title = post.title or db_post.title
+        await bump_watermarks(db, posts_scope(), posts_scope(user.id))
         await db.commit()
-        await db.refresh(db_post)
-        return db_post
+        invalidate_post(db_post.slug)
+        return model_response(schemas.PostResponse, db_post)
     except Exception as exc:
         await db.rollback()
-        logger.error(f"Post could not be updated : {str(exc)}")
+        logger.error("Post could not be updated : %s", exc)
         raise HTTPException(401, "Post could not be updated")
 
 
@@ -105,10 +408,14 @@ async def delete_post(
         db_post = result.scalar_one_or_none()
         if db_post is None:
             raise HTTPException(404, f"Post with id: {blog_id} not found")
+        slug = db_post.slug
+        await db.execute(delete(PostStats).where(PostStats.post_id == db_post.id))
         await db.delete(db_post)
+        await bump_watermarks(db, posts_scope(), posts_scope(user.id))
         await db.commit()
+        invalidate_post(slug)
         return
     except Exception as exc:
         await db.rollback()
-        logger.error(f"Post could not be deleted : {str(exc)}")
+        logger.error("Post could not be deleted : %s", exc)
         raise HTTPException(401, "Post could not be deleted")
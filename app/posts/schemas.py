@@ -1,4 +1,5 @@
 from datetime import datetime
+from typing import Optional
 
 from pydantic import BaseModel, ConfigDict
 
@@ -20,17 +21,30 @@ class Comment(BaseModel):
 class CommentDetail(BaseModel):
     message: str
     author: UserAuthor
+    created_at: datetime
     model_config = ConfigDict(from_attributes=True)
 
 
+class CommentPage(BaseModel):
+    items: list[CommentDetail]
+    next_cursor: Optional[str]
+
+
 class PostList(BaseModel):
     title: str
-    body: str
+    excerpt: Optional[str]
+    body: Optional[str] = None
     slug: str
+    comment_count: int
     created_at: datetime
     model_config = ConfigDict(from_attributes=True)
 
 
+class PostPage(BaseModel):
+    items: list[PostList]
+    next_cursor: Optional[str]
+
+
 class PostListOwner(BaseModel):
     id: int
     title: str
@@ -49,10 +63,34 @@ class PostResponse(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+class PostExport(BaseModel):
+    title: str
+    body: str
+    slug: str
+    created_at: datetime
+    updated_at: Optional[datetime]
+    model_config = ConfigDict(from_attributes=True)
+
+
+class ImportResult(BaseModel):
+    imported: int
+
+
 class PostDetail(BaseModel):
     title: str
     body: str
     author: UserAuthor
     created_at: datetime
+    comment_count: int
+    views: int
+    unique_viewers: int
     comments: list[CommentDetail]
+    comments_next_cursor: Optional[str]
+    model_config = ConfigDict(from_attributes=True)
+
+
+class PostViews(BaseModel):
+    slug: str
+    views: int
+    unique_viewers: int
     model_config = ConfigDict(from_attributes=True)
@@ -0,0 +1,100 @@
+"""
+Full-text search over posts.
+- SQLite: an external-content FTS5 table `posts_fts` kept in sync by triggers.
+- PostgreSQL: a generated `search_vector` tsvector column with a GIN index.
+Both are maintained by the database on every insert, update and delete, so
+`create_post`, `update_post` and `delete_post` never rebuild the index.
+
+Backfill rows that existed before the index was created:
+    python -m app.posts.search
+"""
+
+import asyncio
+
+from fastapi import HTTPException
+from sqlalchemy import column, table, text
+from sqlalchemy.ext.asyncio import AsyncConnection
+from sqlalchemy.sql import Select, select
+
+from .models import Post
+
+posts_fts = table("posts_fts", column("rowid"))
+
+SQLITE_DDL = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS posts_fts
+    USING fts5(title, body, content='posts', content_rowid='id')""",
+    """CREATE TRIGGER IF NOT EXISTS posts_fts_ai AFTER INSERT ON posts BEGIN
+        INSERT INTO posts_fts(rowid, title, body)
+        VALUES (new.id, new.title, new.body);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS posts_fts_ad AFTER DELETE ON posts BEGIN
+        INSERT INTO posts_fts(posts_fts, rowid, title, body)
+        VALUES ('delete', old.id, old.title, old.body);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS posts_fts_au AFTER UPDATE OF title, body ON posts
+    BEGIN
+        INSERT INTO posts_fts(posts_fts, rowid, title, body)
+        VALUES ('delete', old.id, old.title, old.body);
+        INSERT INTO posts_fts(rowid, title, body)
+        VALUES (new.id, new.title, new.body);
+    END""",
+]
+
+POSTGRES_DDL = [
+    """ALTER TABLE posts ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(title, '')), 'A')
+        || setweight(to_tsvector('english', coalesce(body, '')), 'B')
+    ) STORED""",
+    "CREATE INDEX IF NOT EXISTS ix_posts_search_vector ON posts USING GIN (search_vector)",
+]
+
+
+async def ensure_search_index(conn: AsyncConnection):
+    statements = {"sqlite": SQLITE_DDL, "postgresql": POSTGRES_DDL}
+    for statement in statements.get(conn.dialect.name, []):
+        await conn.execute(text(statement))
+
+
+def fts5_query(q: str) -> str:
+    # Quote every term so user input can never be parsed as FTS5 syntax.
+    return " ".join('"' + term.replace('"', '""') + '"' for term in q.split())
+
+
+def search_query(dialect: str, q: str, columns: list) -> Select:
+    if dialect == "sqlite":
+        return (
+            select(*columns)
+            .join(posts_fts, posts_fts.c.rowid == Post.id)
+            .where(text("posts_fts MATCH :q").bindparams(q=fts5_query(q)))
+            .order_by(text("bm25(posts_fts, 10.0, 1.0)"))
+        )
+    if dialect == "postgresql":
+        tsquery = "websearch_to_tsquery('english', :q)"
+        return (
+            select(*columns)
+            .where(text(f"posts.search_vector @@ {tsquery}").bindparams(q=q))
+            .order_by(
+                text(f"ts_rank(posts.search_vector, {tsquery}) DESC").bindparams(q=q)
+            )
+        )
+    raise HTTPException(501, f"Search is not supported on {dialect}")
+
+
+async def rebuild_search_index(conn: AsyncConnection):
+    # PostgreSQL computes the generated column for existing rows on its own.
+    if conn.dialect.name == "sqlite":
+        await conn.execute(text("INSERT INTO posts_fts(posts_fts) VALUES ('rebuild')"))
+
+
+async def backfill():
+    from ..config.db import engine
+
+    async with engine.begin() as conn:
+        await ensure_search_index(conn)
+        await rebuild_search_index(conn)
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(backfill())
@@ -0,0 +1,112 @@
+import asyncio
+import logging
+import time
+from typing import Optional
+
+from sqlalchemy import select
+
+from ..common import serialize
+from ..config import global_config
+from ..config.db import async_session
+from ..config.watermark import posts_scope, read_watermark
+from . import schemas
+
+logger = logging.getLogger(__name__)
+
+
+class FrontPageSnapshot:
+    """
+    First `pages` pages of `GET /api/blog/`, serialized ahead of time.
+    - Rebuilt by a lifespan task as soon as a post changes on this worker, and
+      at least every `max_age` seconds for changes made by other workers.
+    - A rebuild is one query; the pages are swapped in as one new tuple, so a
+      reader sees either the old pages or the new ones, never a mix.
+    - Snapshots older than twice `max_age` (refresher stuck or failing) are
+      not served, the handler falls back to the database.
+    - Each rebuild reads the posts watermark first and keeps its headers, so
+      revalidating a snapshot page needs no query at all.
+    - A local change drops the snapshot at once; a rebuild that overlapped the
+      change is discarded, so this worker never serves pages older than its
+      own writes.
+    """
+
+    def __init__(self, pages: int = 5, page_size: int = 10, max_age: float = 5):
+        self.pages = pages
+        self.page_size = page_size
+        self.max_age = max_age
+        self._snapshot: tuple[float, dict[str, str], tuple[bytes, ...]] = (
+            0.0,
+            {},
+            (),
+        )
+        self._dirty = asyncio.Event()
+        self.hits = 0
+        self.rebuilds = 0
+
+    def get(self, skip: int, limit: int) -> Optional[tuple[dict[str, str], bytes]]:
+        built_at, headers, pages = self._snapshot
+        if limit != self.page_size or skip % limit:
+            return None
+        page = skip // limit
+        if page >= len(pages) or time.monotonic() - built_at > 2 * self.max_age:
+            return None
+        self.hits += 1
+        return headers, pages[page]
+
+    def mark_dirty(self):
+        self._snapshot = (0.0, {}, ())
+        self._dirty.set()
+
+    async def rebuild(self):
+        from .router import list_columns  # the router imports this module
+
+        self._dirty.clear()
+        async with async_session() as session:
+            watermark = await read_watermark(session, posts_scope())
+            result = await session.execute(
+                select(*list_columns(None)).limit(self.pages * self.page_size)
+            )
+            rows = result.all()
+        pages = tuple(
+            serialize(
+                list[schemas.PostList],
+                rows[start : start + self.page_size],
+                exclude_unset=True,
+            )
+            for start in range(0, self.pages * self.page_size, self.page_size)
+        )
+        if self._dirty.is_set():
+            return
+        self._snapshot = (time.monotonic(), watermark.headers(), pages)
+        self.rebuilds += 1
+
+    async def run(self, stop: asyncio.Event):
+        if self.pages <= 0:
+            return
+        while not stop.is_set():
+            try:
+                await self.rebuild()
+            except Exception as exc:
+                logger.error("Front page snapshot rebuild failed: %s", exc)
+            dirty = asyncio.create_task(self._dirty.wait())
+            halt = asyncio.create_task(stop.wait())
+            await asyncio.wait(
+                (dirty, halt),
+                timeout=self.max_age,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            dirty.cancel()
+            halt.cancel()
+
+    def stats(self) -> dict:
+        return {
+            "pages": len(self._snapshot[2]),
+            "age_seconds": time.monotonic() - self._snapshot[0],
+            "hits": self.hits,
+            "rebuilds": self.rebuilds,
+        }
+
+
+front_page = FrontPageSnapshot(
+    pages=global_config.FRONT_PAGE_PAGES, max_age=global_config.FRONT_PAGE_MAX_AGE
+)
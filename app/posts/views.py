@@ -0,0 +1,150 @@
+import asyncio
+import logging
+from collections import defaultdict
+
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..common import HyperLogLog
+from ..config import global_config
+from ..config.db import async_session, upsert
+from .models import Post, PostStats
+
+logger = logging.getLogger(__name__)
+
+
+class ViewCounter:
+    """
+    Counts post detail views in memory and writes them as one upsert per flush.
+    - Per slug it keeps a view count and a HyperLogLog of viewers, so memory
+      per post is fixed however many people read it.
+    - Flushes every `flush_interval` seconds, or as soon as `max_posts` slugs wait.
+    - The flush merges the stored sketch with the new one register by register,
+      so unique viewers add up across flushes and workers without keeping
+      viewer ids. Read, merge and write happen under the row locks taken by
+      the count upsert, so concurrent flushes from other workers don't lose
+      each other's registers.
+    - A failed flush puts its counts back for the next one.
+    """
+
+    def __init__(
+        self, flush_interval: float = 10, max_posts: int = 1000, precision: int = 10
+    ):
+        self.flush_interval = flush_interval
+        self.max_posts = max_posts
+        self.precision = precision
+        self._views: dict[str, int] = defaultdict(int)
+        self._viewers: dict[str, HyperLogLog] = {}
+        self._full = asyncio.Event()
+
+    def record(self, slug: str, viewer: str):
+        self._views[slug] += 1
+        sketch = self._viewers.get(slug)
+        if sketch is None:
+            sketch = self._viewers[slug] = HyperLogLog(self.precision)
+        sketch.add(viewer)
+        if len(self._views) >= self.max_posts:
+            self._full.set()
+
+    def _restore(self, views: dict[str, int], viewers: dict[str, HyperLogLog]):
+        for slug, count in views.items():
+            self._views[slug] += count
+            if slug in self._viewers:
+                self._viewers[slug].merge(viewers[slug])
+            else:
+                self._viewers[slug] = viewers[slug]
+
+    async def flush(self) -> int:
+        if not self._views:
+            return 0
+        views, self._views = self._views, defaultdict(int)
+        viewers, self._viewers = self._viewers, {}
+        self._full.clear()
+        try:
+            async with async_session() as session:
+                result = await session.execute(
+                    select(Post.id, Post.slug).where(Post.slug.in_(views))
+                )
+                post_ids = dict(result.all())
+                if post_ids:
+                    await self._write(session, post_ids, views, viewers)
+                await session.commit()
+        except Exception as exc:
+            logger.error("Flushing views of %d posts failed: %s", len(views), exc)
+            self._restore(views, viewers)
+            return 0
+        return len(post_ids)
+
+    async def _write(
+        self,
+        session: AsyncSession,
+        post_ids: dict[int, str],
+        views: dict[str, int],
+        viewers: dict[str, HyperLogLog],
+    ):
+        # Writing the counts first takes the row locks (the database write lock
+        # on SQLite), so the sketches read next can't change under us before
+        # the merged ones are written back in the same transaction.
+        query = upsert(session, PostStats).values(
+            [
+                {
+                    "post_id": post_id,
+                    "slug": slug,
+                    "views": views[slug],
+                    "unique_viewers": viewers[slug].count(),
+                    "sketch": viewers[slug].to_bytes(),
+                }
+                for post_id, slug in post_ids.items()
+            ]
+        )
+        await session.execute(
+            query.on_conflict_do_update(
+                index_elements=[PostStats.post_id],
+                set_={
+                    "views": PostStats.views + query.excluded.views,
+                    "updated_at": func.now(),
+                },
+            )
+        )
+        result = await session.execute(
+            select(PostStats.post_id, PostStats.sketch)
+            .where(PostStats.post_id.in_(post_ids))
+            .with_for_update()
+        )
+        rows = []
+        for post_id, stored in result.all():
+            # A sketch merged with itself is unchanged, so rows just inserted
+            # with ours need no special case.
+            sketch = HyperLogLog.from_bytes(stored)
+            sketch.merge(viewers[post_ids[post_id]])
+            rows.append(
+                {
+                    "post_id": post_id,
+                    "unique_viewers": sketch.count(),
+                    "sketch": sketch.to_bytes(),
+                }
+            )
+        await session.execute(update(PostStats), rows)
+
+    async def run(self, stop: asyncio.Event):
+        while not stop.is_set():
+            wake = asyncio.create_task(self._full.wait())
+            halt = asyncio.create_task(stop.wait())
+            await asyncio.wait(
+                (wake, halt),
+                timeout=self.flush_interval,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            wake.cancel()
+            halt.cancel()
+            await self.flush()
+        await self.flush()
+
+    def stats(self) -> dict:
+        return {"pending_posts": len(self._views)}
+
+
+view_counter = ViewCounter(
+    flush_interval=global_config.VIEW_FLUSH_INTERVAL,
+    max_posts=global_config.VIEW_BUFFER_SIZE,
+)
@@ -0,0 +1,83 @@
+"""
+Bytes and latency per page of the post listing, excerpt vs full body.
+
+Usage (from the repository root):
+    python benchmarks/list_payload.py [--posts 2000] [--body-size 5000] [--pages 150]
+
+`?fields=body` returns the full body as every listing did before excerpts.
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault(
+    "DATABASE_URL", f"sqlite+aiosqlite:///{tempfile.mkdtemp()}/bench.db"
+)
+os.environ.setdefault("SECRET_KEY", "benchmark-secret-key")
+os.environ.setdefault("ALGORITHM", "HS256")
+os.environ.setdefault("ENV_STATE", "bench")
+
+import httpx  # noqa: E402
+from sqlalchemy import insert  # noqa: E402
+
+from app.auth.models import User  # noqa: E402
+from app.common import make_excerpt  # noqa: E402
+from app.config.db import async_session  # noqa: E402
+from app.main import app  # noqa: E402
+from app.posts.models import Post  # noqa: E402
+
+
+async def seed(posts: int, body_size: int):
+    words = ("lorem ipsum dolor sit amet consectetur adipiscing elit " * 1000).split()
+    body = " ".join(words)[:body_size]
+    async with async_session() as session:
+        await session.execute(insert(User).values(full_name="Bench", username="bench"))
+        rows = [
+            {
+                "slug": f"post-{i}",
+                "title": f"Post {i}",
+                "body": body,
+                "excerpt": make_excerpt(body, 200),
+                "user_id": 1,
+            }
+            for i in range(posts)
+        ]
+        await session.execute(insert(Post), rows)
+        await session.commit()
+
+
+async def run(args):
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        await seed(args.posts, args.body_size)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as c:
+            for label, params in (("excerpt", {}), ("fields=body", {"fields": "body"})):
+                sizes, samples = [], []
+                for page in range(args.pages):
+                    start = time.perf_counter()
+                    response = await c.get(
+                        "/api/blog/", params={"skip": page * 10, **params}
+                    )
+                    samples.append(time.perf_counter() - start)
+                    sizes.append(len(response.content))
+                print(
+                    f"{label:>12}: {statistics.mean(sizes):9.0f} bytes/page "
+                    f"p50={statistics.median(samples) * 1000:6.2f}ms "
+                    f"mean={statistics.mean(samples) * 1000:6.2f}ms"
+                )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--posts", type=int, default=2000)
+    parser.add_argument("--body-size", type=int, default=5000)
+    parser.add_argument("--pages", type=int, default=150)
+    asyncio.run(run(parser.parse_args()))
@@ -0,0 +1,145 @@
+"""
+Poll-heavy list traffic with and without conditional GET.
+
+Usage (from the repository root):
+    python benchmarks/list_polling.py [--posts 2000] [--clients 20] [--polls 100] [--write-every 200]
+
+Every client polls the public post list (with `?fields=body`, so the front
+page snapshot does not answer it), its author's post list and its draft
+list. In "conditional" mode it sends back the last ETag as `If-None-Match`,
+in "plain" mode it does not. One post is created and one draft updated
+every `--write-every` polls, so some polls do find changes.
+"""
+
+import argparse
+import asyncio
+import itertools
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault(
+    "DATABASE_URL", f"sqlite+aiosqlite:///{tempfile.mkdtemp()}/bench.db"
+)
+os.environ.setdefault("SECRET_KEY", "benchmark-secret-key")
+os.environ.setdefault("ALGORITHM", "HS256")
+os.environ.setdefault("ENV_STATE", "bench")
+os.environ.setdefault("EMAIL_WORKER_IN_PROCESS", "false")
+
+import httpx  # noqa: E402
+from sqlalchemy import insert  # noqa: E402
+
+from app.auth.models import User  # noqa: E402
+from app.auth.utils import JWTRepo  # noqa: E402
+from app.common import make_excerpt  # noqa: E402
+from app.config.db import async_session  # noqa: E402
+from app.diary.models import Draft  # noqa: E402
+from app.main import app  # noqa: E402
+from app.posts.models import Post  # noqa: E402
+
+ENDPOINTS = (
+    ("/api/blog/", {"fields": "body"}),
+    ("/api/blog/posts/", {}),
+    ("/api/draft/", {}),
+)
+writes = itertools.count()
+
+
+async def seed(posts: int, users: int):
+    body = "lorem ipsum dolor sit amet " * 40
+    async with async_session() as session:
+        await session.execute(
+            insert(User),
+            [
+                {
+                    "full_name": f"U{i}",
+                    "username": f"u{i}",
+                    "email": f"u{i}@example.com",
+                }
+                for i in range(users)
+            ],
+        )
+        rows = [
+            {
+                "slug": f"post-{i}",
+                "title": f"Post {i}",
+                "body": body,
+                "excerpt": make_excerpt(body, 200),
+                "user_id": i % users + 1,
+            }
+            for i in range(posts)
+        ]
+        await session.execute(insert(Post), rows)
+        drafts = [
+            {"title": f"Draft {i}", "body": body, "user_id": i % users + 1}
+            for i in range(posts)
+        ]
+        await session.execute(insert(Draft), drafts)
+        await session.commit()
+
+
+async def poll(c: httpx.AsyncClient, user_id: int, args, conditional: bool, stats):
+    headers = {"Authorization": f"Bearer {JWTRepo.create_token(user_id, 'access')}"}
+    etags = {}
+    for i in range(args.polls):
+        path, params = ENDPOINTS[i % len(ENDPOINTS)]
+        request_headers = dict(headers)
+        if conditional and path in etags:
+            request_headers["If-None-Match"] = etags[path]
+        start = time.perf_counter()
+        response = await c.get(path, params=params, headers=request_headers)
+        stats["samples"].append(time.perf_counter() - start)
+        stats["bytes"] += len(response.content)
+        stats["not_modified"] += response.status_code == 304
+        etags[path] = response.headers.get("etag", etags.get(path))
+        stats["polls"] += 1
+        if stats["polls"] % args.write_every == 0:
+            write = next(writes)
+            await c.post(
+                "/api/blog/",
+                json={"title": f"New {write}", "body": "fresh"},
+                headers=headers,
+            )
+            await c.patch(
+                f"/api/draft/{user_id}",
+                json={"title": f"Edited {write}", "body": ""},
+                headers=headers,
+            )
+
+
+async def run(args):
+    logging.disable(logging.CRITICAL)
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        await seed(args.posts, args.clients)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as c:
+            for label, conditional in (("plain", False), ("conditional", True)):
+                stats = {"samples": [], "bytes": 0, "not_modified": 0, "polls": 0}
+                start = time.perf_counter()
+                await asyncio.gather(
+                    *(
+                        poll(c, user_id, args, conditional, stats)
+                        for user_id in range(1, args.clients + 1)
+                    )
+                )
+                elapsed = time.perf_counter() - start
+                samples = stats["samples"]
+                print(
+                    f"{label:>11}: {len(samples) / elapsed:7.0f} polls/s "
+                    f"p50={statistics.median(samples) * 1000:6.2f}ms "
+                    f"304={stats['not_modified'] / len(samples):4.0%} "
+                    f"{stats['bytes'] / len(samples):7.0f} bytes/poll"
+                )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--posts", type=int, default=2000)
+    parser.add_argument("--clients", type=int, default=20)
+    parser.add_argument("--polls", type=int, default=100)
+    parser.add_argument("--write-every", type=int, default=200)
+    asyncio.run(run(parser.parse_args()))
@@ -0,0 +1,108 @@
+"""
+Request throughput with logging off, written inline, and handed to a queue thread.
+
+Usage (from the repository root):
+    python benchmarks/logging_overhead.py [--requests 2000] [--concurrency 8]
+
+Every mode runs in a fresh process because logging settings are read at import.
+All logging modes use ENV_STATE=dev and LOG_ACCESS=true, i.e. one access record
+per request plus the routers' debug records, written to app/api.log.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+MODES = {
+    "off": {},
+    "inline": {"LOG_ASYNC": "false"},
+    "queue": {"LOG_ASYNC": "true"},
+    "queue+json": {"LOG_ASYNC": "true", "LOG_FORMAT": "json"},
+}
+
+
+async def measure(requests: int, concurrency: int) -> float:
+    import httpx
+    from sqlalchemy import insert
+
+    from app.auth.models import User
+    from app.auth.utils import JWTRepo
+    from app.config.db import async_session
+    from app.main import app
+
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        if os.environ["BENCH_MODE"] == "off":
+            logging.disable(logging.CRITICAL)
+        logging.getLogger("httpx").setLevel(logging.WARNING)
+        async with async_session() as session:
+            await session.execute(
+                insert(User).values(
+                    full_name="Bench",
+                    email="bench@example.com",
+                    username="bench",
+                    is_confirmed=True,
+                )
+            )
+            await session.commit()
+        headers = {"Authorization": f"Bearer {JWTRepo.create_token(1, 'access')}"}
+        draft = {"title": "Benchmark draft", "body": "body " * 50}
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as c:
+            remaining = iter(range(requests))
+
+            async def worker():
+                for i in remaining:
+                    if i % 2:
+                        await c.get("/api/blog/", params={"limit": 5})
+                    else:
+                        await c.post("/api/draft/", json=draft, headers=headers)
+
+            start = time.perf_counter()
+            await asyncio.gather(*(worker() for _ in range(concurrency)))
+            return requests / (time.perf_counter() - start)
+
+
+def child(args):
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    print(json.dumps(asyncio.run(measure(args.requests, args.concurrency))))
+
+
+def parent(args):
+    for mode, settings in MODES.items():
+        env = {
+            **os.environ,
+            "DATABASE_URL": f"sqlite+aiosqlite:///{tempfile.mkdtemp()}/bench.db",
+            "SECRET_KEY": "benchmark-secret-key",
+            "ALGORITHM": "HS256",
+            "ENV_STATE": "dev",
+            "LOG_ACCESS": "true",
+            "BENCH_MODE": mode,
+            **settings,
+        }
+        output = subprocess.run(
+            [sys.executable, __file__, "--child", *sys.argv[1:]],
+            env=env,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        throughput = json.loads(output.strip().splitlines()[-1])
+        print(f"{mode:>11}: {throughput:8.1f} req/s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    arguments = parser.parse_args()
+    if arguments.child:
+        child(arguments)
+    else:
+        parent(arguments)
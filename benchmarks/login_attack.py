@@ -0,0 +1,146 @@
+"""
+Login latency of legitimate users while a credential-stuffing attack runs.
+
+Usage (from the repository root):
+    python benchmarks/login_attack.py [--users 8] [--interval 8] [--attackers 32]
+                                      [--attack-ips 2] [--attack-rate 50]
+                                      [--warmup 20] [--seconds 30]
+
+Three phases run back to back: no attack, an attack with the rate limiter off,
+and the same attack with it on. Attackers cycle through existing accounts with
+wrong passwords, so every attempt that gets past the limiter costs a bcrypt
+verify. Each legitimate user logs in every `--interval` seconds from its own
+IP, which stays under the per-user limit. Good users are measured for
+`--seconds` once the attack has run for `--warmup` seconds, i.e. after the
+attackers have spent the burst their buckets start with.
+"""
+
+import argparse
+import asyncio
+import itertools
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault(
+    "DATABASE_URL", f"sqlite+aiosqlite:///{tempfile.mkdtemp()}/bench.db"
+)
+os.environ.setdefault("SECRET_KEY", "benchmark-secret-key")
+os.environ.setdefault("ALGORITHM", "HS256")
+os.environ.setdefault("ENV_STATE", "bench")
+
+import httpx  # noqa: E402
+from sqlalchemy import insert  # noqa: E402
+
+from app.auth.hashing import hashing_pool  # noqa: E402
+from app.auth.models import User  # noqa: E402
+from app.auth.ratelimit import limiters  # noqa: E402
+from app.config.db import async_session  # noqa: E402
+from app.main import app  # noqa: E402
+
+PASSWORD = "bench-password"
+VICTIMS = 200
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+async def seed(users: int):
+    password = await hashing_pool.hash(PASSWORD)
+    names = [f"good{i}" for i in range(users)] + [f"victim{i}" for i in range(VICTIMS)]
+    async with async_session() as session:
+        await session.execute(
+            insert(User),
+            [
+                {
+                    "full_name": name,
+                    "email": f"{name}@example.com",
+                    "username": name,
+                    "password": password,
+                    "is_confirmed": True,
+                }
+                for name in names
+            ],
+        )
+        await session.commit()
+
+
+def client(ip: str) -> httpx.AsyncClient:
+    transport = httpx.ASGITransport(app=app, client=(ip, 123))
+    return httpx.AsyncClient(transport=transport, base_url="http://bench")
+
+
+async def phase(args, attack: bool, limited: bool) -> tuple[list, Counter, Counter]:
+    for limiter in limiters.values():
+        limiter.enabled = limited
+        limiter.clear()
+    warmup = args.warmup if attack else 0
+    deadline = time.perf_counter() + warmup + args.seconds
+    latencies, good_statuses, attack_statuses = [], Counter(), Counter()
+    victims = itertools.cycle(range(VICTIMS))
+    pace = args.attackers / args.attack_rate
+
+    async def good_user(i):
+        await asyncio.sleep(warmup + args.interval * i / args.users)
+        async with client(f"10.0.0.{i + 1}") as c:
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                form = {"username": f"good{i}", "password": PASSWORD}
+                response = await c.post("/api/user/login/", data=form)
+                latencies.append(time.perf_counter() - start)
+                good_statuses[response.status_code] += 1
+                await asyncio.sleep(
+                    max(0.0, start + args.interval - time.perf_counter())
+                )
+
+    async def attacker(i):
+        async with client(f"192.0.2.{i % args.attack_ips + 1}") as c:
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                form = {"username": f"victim{next(victims)}", "password": "guess"}
+                response = await c.post("/api/user/login/", data=form)
+                attack_statuses[response.status_code] += 1
+                # The attack client shares the CPU with the server, so it is
+                # paced to --attack-rate requests per second overall.
+                await asyncio.sleep(max(0.0, start + pace - time.perf_counter()))
+
+    attackers = [attacker(i) for i in range(args.attackers)] if attack else []
+    await asyncio.gather(*(good_user(i) for i in range(args.users)), *attackers)
+    return latencies, good_statuses, attack_statuses
+
+
+async def run(args):
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    async with app.router.lifespan_context(app):
+        await seed(args.users)
+        for label, attack, limited in (
+            ("no attack", False, True),
+            ("attack, limiter off", True, False),
+            ("attack, limiter on", True, True),
+        ):
+            latencies, good, attacks = await phase(args, attack, limited)
+            print(
+                f"{label:>20}: good logins n={len(latencies):<4} "
+                f"p50={statistics.median(latencies) * 1000:8.1f}ms "
+                f"p99={percentile(latencies, 99) * 1000:8.1f}ms "
+                f"statuses={dict(good)} attacker statuses={dict(attacks)}"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=8)
+    parser.add_argument("--interval", type=float, default=8.0)
+    parser.add_argument("--attackers", type=int, default=32)
+    parser.add_argument("--attack-ips", type=int, default=2)
+    parser.add_argument("--attack-rate", type=float, default=50.0)
+    parser.add_argument("--warmup", type=float, default=20.0)
+    parser.add_argument("--seconds", type=float, default=30.0)
+    asyncio.run(run(parser.parse_args()))
@@ -0,0 +1,110 @@
+"""
+p99 latency of `GET /api/blog/` while logins run concurrently.
+
+Usage (from the repository root):
+    python benchmarks/login_burst.py [--logins 8] [--readers 4] [--seconds 5] [--inline]
+
+`--inline` runs bcrypt on the event loop (the old behaviour) for comparison.
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault(
+    "DATABASE_URL", f"sqlite+aiosqlite:///{tempfile.mkdtemp()}/bench.db"
+)
+os.environ.setdefault("SECRET_KEY", "benchmark-secret-key")
+os.environ.setdefault("ALGORITHM", "HS256")
+os.environ.setdefault("ENV_STATE", "bench")
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+
+import bcrypt  # noqa: E402
+import httpx  # noqa: E402
+from sqlalchemy import update  # noqa: E402
+
+from app.auth.hashing import hashing_pool  # noqa: E402
+from app.auth.models import User  # noqa: E402
+from app.config.db import async_session  # noqa: E402
+from app.main import app  # noqa: E402
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+async def use_inline_bcrypt():
+    async def inline_hash(raw_password):
+        return bcrypt.hashpw(raw_password.encode(), bcrypt.gensalt())
+
+    async def inline_verify(plain_password, hashed_password):
+        if isinstance(hashed_password, str):
+            hashed_password = hashed_password.encode()
+        return bcrypt.checkpw(plain_password.encode(), hashed_password)
+
+    hashing_pool.hash = inline_hash
+    hashing_pool.verify = inline_verify
+
+
+async def run(args):
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    if args.inline:
+        await use_inline_bcrypt()
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as c:
+            user = {"full_name": "B", "email": "b@example.com", "username": "b"}
+            await c.post("/api/user/register/", json={**user, "password": "pw"})
+            async with async_session() as session:
+                await session.execute(update(User).values(is_confirmed=True))
+                await session.commit()
+
+            async def reader(samples, deadline):
+                while time.perf_counter() < deadline:
+                    start = time.perf_counter()
+                    await c.get("/api/blog/")
+                    samples.append(time.perf_counter() - start)
+
+            async def login(statuses, deadline):
+                while time.perf_counter() < deadline:
+                    form = {"username": "b", "password": "pw"}
+                    response = await c.post("/api/user/login/", data=form)
+                    statuses.append(response.status_code)
+
+            async def phase(logins):
+                samples, statuses = [], []
+                deadline = time.perf_counter() + args.seconds
+                await asyncio.gather(
+                    *(reader(samples, deadline) for _ in range(args.readers)),
+                    *(login(statuses, deadline) for _ in range(logins)),
+                )
+                return samples, statuses
+
+            idle, _ = await phase(0)
+            busy, statuses = await phase(args.logins)
+
+    for label, samples in (("idle", idle), ("during logins", busy)):
+        print(
+            f"GET /api/blog/ {label:>14}: n={len(samples):<6} "
+            f"p50={statistics.median(samples) * 1000:8.2f}ms "
+            f"p99={percentile(samples, 99) * 1000:8.2f}ms"
+        )
+    print(f"logins completed: {len(statuses)} ({statuses.count(200)} ok)")
+    print("hashing pool:", hashing_pool.stats())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--logins", type=int, default=8, help="concurrent login loops")
+    parser.add_argument("--readers", type=int, default=4, help="concurrent GET loops")
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--inline", action="store_true")
+    run_args = parser.parse_args()
+    asyncio.run(run(run_args))
@@ -0,0 +1,112 @@
+"""
+SQL statements run by each write endpoint, checked against the expected count.
+
+Usage (from the repository root):
+    python benchmarks/query_counts.py
+
+Counts come from the `Server-Timing` header the metrics middleware adds, so
+they cover every statement of the request, including the authentication
+lookup. The user cache is warmed first. Exits with status 1 if any endpoint
+runs more statements than listed in EXPECTED, e.g. because a write went back
+to SELECT-then-update or a refresh() came back after commit.
+"""
+
+import asyncio
+import logging
+import os
+import re
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault(
+    "DATABASE_URL", f"sqlite+aiosqlite:///{tempfile.mkdtemp()}/bench.db"
+)
+os.environ.setdefault("SECRET_KEY", "benchmark-secret-key")
+os.environ.setdefault("ALGORITHM", "HS256")
+os.environ.setdefault("ENV_STATE", "bench")
+os.environ.setdefault("EMAIL_WORKER_IN_PROCESS", "false")
+
+import httpx  # noqa: E402
+
+from app.auth.utils import JWTRepo  # noqa: E402
+from app.main import app  # noqa: E402
+
+# Statements per request. Commits are not statements and come on top.
+EXPECTED = {
+    "register": 2,  # INSERT user RETURNING, INSERT outbox email
+    "confirm_email": 1,  # UPDATE users RETURNING
+    "create_post": 2,  # INSERT posts RETURNING, upsert list watermarks
+    "update_post": 2,  # UPDATE posts RETURNING, upsert list watermarks
+    "create_draft": 2,  # INSERT drafts RETURNING, upsert list watermark
+    "update_draft": 2,  # UPDATE drafts RETURNING, upsert list watermark
+    "password_reset": 2,  # UPDATE users RETURNING, INSERT token revocation
+}
+
+
+def statements(response: httpx.Response) -> int:
+    response.raise_for_status()
+    timing = response.headers["server-timing"]
+    return int(re.search(r'desc="(\d+) queries"', timing).group(1))
+
+
+async def measure() -> dict:
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://b") as c:
+            user = {"full_name": "Q", "email": "q@example.com", "username": "q"}
+            register = await c.post(
+                "/api/user/register/", json={**user, "password": "pw"}
+            )
+            user_id = register.json()["id"]
+            confirm = await c.get(
+                f"/api/user/confirm-email/{JWTRepo.create_token(user_id, 'confirm')}"
+            )
+            headers = {
+                "Authorization": f"Bearer {JWTRepo.create_token(user_id, 'access')}"
+            }
+            await c.get("/api/draft/", headers=headers)
+            content = {"title": "Query count", "body": "body " * 50}
+            create_post = await c.post("/api/blog/", json=content, headers=headers)
+            update_post = await c.patch(
+                f"/api/blog/{create_post.json()['id']}",
+                json={"title": "Query count", "body": "new body"},
+                headers=headers,
+            )
+            create_draft = await c.post("/api/draft/", json=content, headers=headers)
+            update_draft = await c.patch(
+                f"/api/draft/{create_draft.json()['id']}",
+                json={"title": "Query count", "body": "new body"},
+                headers=headers,
+            )
+            reset_token = JWTRepo.create_token(user_id, "reset")
+            password_reset = await c.post(
+                "/api/user/password-reset/",
+                json={"password": "new-pw", "reset_token": reset_token},
+            )
+    return {
+        "register": statements(register),
+        "confirm_email": statements(confirm),
+        "create_post": statements(create_post),
+        "update_post": statements(update_post),
+        "create_draft": statements(create_draft),
+        "update_draft": statements(update_draft),
+        "password_reset": statements(password_reset),
+    }
+
+
+def main() -> int:
+    logging.disable(logging.CRITICAL)
+    counts = asyncio.run(measure())
+    failed = False
+    for name, expected in EXPECTED.items():
+        ok = counts[name] <= expected
+        failed |= not ok
+        print(
+            f"{name:>15}: {counts[name]} (expected {expected}) {'ok' if ok else 'FAIL'}"
+        )
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
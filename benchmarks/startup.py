@@ -0,0 +1,104 @@
+"""
+Import time, lifespan startup time and time-to-first-request of the app.
+
+Usage (from the repository root):
+    python benchmarks/startup.py [--runs 5]
+
+Each run is a fresh interpreter. "new db" starts against an empty database, so
+the schema is created; "existing db" reuses one that is already up to date,
+which is the normal case for a worker joining a running deployment.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+HEAVY_MODULES = ("bcrypt", "jose", "smtplib", "email.mime.multipart")
+
+
+def child():
+    start = time.perf_counter()
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from app.main import app
+
+    imported = time.perf_counter()
+    heavy_after_import = [name for name in HEAVY_MODULES if name in sys.modules]
+
+    async def first_request():
+        import httpx
+
+        transport = httpx.ASGITransport(app=app)
+        async with app.router.lifespan_context(app):
+            started = time.perf_counter()
+            async with httpx.AsyncClient(transport=transport, base_url="http://b") as c:
+                response = await c.get("/api/blog/")
+                response.raise_for_status()
+            return started, time.perf_counter()
+
+    started, answered = asyncio.run(first_request())
+    print(
+        json.dumps(
+            {
+                "import": imported - start,
+                "lifespan": started - imported,
+                "first_request": answered - start,
+                "heavy_after_import": heavy_after_import,
+            }
+        )
+    )
+
+
+def run(database_url: str) -> dict:
+    env = {
+        **os.environ,
+        "DATABASE_URL": database_url,
+        "SECRET_KEY": "benchmark-secret-key",
+        "ALGORITHM": "HS256",
+        "ENV_STATE": "bench",
+        "EMAIL_WORKER_IN_PROCESS": "false",
+    }
+    output = subprocess.run(
+        [sys.executable, __file__, "--child"],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def parent(args):
+    existing = f"sqlite+aiosqlite:///{tempfile.mkdtemp()}/bench.db"
+    run(existing)
+    for label, make_url in (
+        ("new db", lambda: f"sqlite+aiosqlite:///{tempfile.mkdtemp()}/bench.db"),
+        ("existing db", lambda: existing),
+    ):
+        results = [run(make_url()) for _ in range(args.runs)]
+        medians = {
+            key: statistics.median(result[key] for result in results) * 1000
+            for key in ("import", "lifespan", "first_request")
+        }
+        print(
+            f"{label:>12}: import={medians['import']:7.1f}ms "
+            f"lifespan={medians['lifespan']:7.1f}ms "
+            f"first request={medians['first_request']:7.1f}ms "
+            f"heavy modules after import={results[-1]['heavy_after_import']}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    arguments = parser.parse_args()
+    if arguments.child:
+        child()
+    else:
+        parent(arguments)
@@ -0,0 +1,355 @@
+"""
+Throughput and p50/p95/p99 latency for every route, driven in-process.
+
+Usage (from the repository root):
+    python benchmarks/suite.py [--users 200] [--posts 5000] [--comments 20000]
+                               [--drafts 2000] [--requests 200] [--concurrency 8]
+                               [--output benchmarks/baselines/suite.json]
+                               [--compare benchmarks/baselines/suite.json]
+                               [--only blog_detail_hot,login_concurrent]
+
+Seeds a fresh SQLite database, runs each scenario against the ASGI app and
+writes the results as JSON. Commit the JSON as a baseline; a regression then
+shows up as a diff, or run with `--compare` to print the change per route.
+Register and login run bcrypt, so they use `--auth-requests` instead.
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import os
+import platform
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault(
+    "DATABASE_URL", f"sqlite+aiosqlite:///{tempfile.mkdtemp()}/bench.db"
+)
+os.environ.setdefault("SECRET_KEY", "benchmark-secret-key")
+os.environ.setdefault("ALGORITHM", "HS256")
+os.environ.setdefault("ENV_STATE", "bench")
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+
+import httpx  # noqa: E402
+from sqlalchemy import desc, func, insert, select, update  # noqa: E402
+
+from app.auth.hashing import hashing_pool  # noqa: E402
+from app.auth.models import User  # noqa: E402
+from app.auth.utils import JWTRepo  # noqa: E402
+from app.common import make_excerpt  # noqa: E402
+from app.common.pagination import encode_cursor  # noqa: E402
+from app.config.db import async_session  # noqa: E402
+from app.diary.models import Draft  # noqa: E402
+from app.main import app  # noqa: E402
+from app.posts.models import Comment, Post  # noqa: E402
+
+PASSWORD = "bench-password"
+BODY = " ".join(
+    ("lorem ipsum dolor sit amet consectetur adipiscing elit " * 200).split()
+)
+
+
+async def seed(args) -> dict:
+    """Bulk-insert the dataset and return what the scenarios need to address it."""
+    password = await hashing_pool.hash(PASSWORD)
+    excerpt = make_excerpt(BODY, 200)
+    async with async_session() as session:
+        await session.execute(
+            insert(User),
+            [
+                {
+                    "full_name": f"User {i}",
+                    "email": f"user-{i}@example.com",
+                    "username": f"user-{i}",
+                    "password": password,
+                    "is_confirmed": True,
+                }
+                for i in range(args.users)
+            ],
+        )
+        await session.execute(
+            insert(Post),
+            [
+                {
+                    "slug": f"post-{i}",
+                    "title": f"Post {i}",
+                    "body": BODY,
+                    "excerpt": excerpt,
+                    "user_id": i % args.users + 1,
+                }
+                for i in range(args.posts)
+            ],
+        )
+        # Half of the comments land on the hot post, the rest are spread out.
+        await session.execute(
+            insert(Comment),
+            [
+                {
+                    "message": f"Comment {i}",
+                    "user_id": i % args.users + 1,
+                    "post_id": 1 if i % 2 else i % args.posts + 1,
+                }
+                for i in range(args.comments)
+            ],
+        )
+        counts = (
+            select(func.count(Comment.id))
+            .where(Comment.post_id == Post.id)
+            .scalar_subquery()
+        )
+        await session.execute(update(Post).values(comment_count=counts))
+        await session.execute(
+            insert(Draft),
+            [
+                {
+                    "title": f"Draft {i}",
+                    "body": BODY,
+                    "excerpt": excerpt,
+                    "user_id": i % args.users + 1,
+                }
+                for i in range(args.drafts)
+            ],
+        )
+        depth = max(args.posts - 20, 0)
+        result = await session.execute(
+            select(Post.created_at, Post.id)
+            .order_by(desc(Post.created_at), desc(Post.id))
+            .offset(depth)
+            .limit(1)
+        )
+        deep = result.one()
+        await session.commit()
+    return {
+        "depth": depth,
+        "deep_cursor": encode_cursor(deep.created_at, deep.id),
+        "tokens": {
+            user_id: JWTRepo.create_token(user_id, "access", 600)
+            for user_id in range(1, args.users + 1)
+        },
+    }
+
+
+def summarize(latencies: list[float], errors: int, elapsed: float) -> dict:
+    cuts = statistics.quantiles(latencies, n=100, method="inclusive")
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput_rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(cuts[49] * 1000, 2),
+        "p95_ms": round(cuts[94] * 1000, 2),
+        "p99_ms": round(cuts[98] * 1000, 2),
+    }
+
+
+async def drive(send, requests: int, concurrency: int) -> dict:
+    """Run `send(i)` for i in range(requests) from `concurrency` workers."""
+    latencies: list[float] = []
+    errors = 0
+    counter = itertools.count()
+
+    async def worker():
+        nonlocal errors
+        while (i := next(counter)) < requests:
+            start = time.perf_counter()
+            response = await send(i)
+            latencies.append(time.perf_counter() - start)
+            errors += response.status_code >= 400
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies, errors, time.perf_counter() - start)
+
+
+def scenarios(c: httpx.AsyncClient, args, data: dict) -> dict:
+    """Name -> (send, requests, concurrency)."""
+    users, posts = args.users, args.posts
+    tokens = data["tokens"]
+
+    def auth(user_id: int) -> dict:
+        return {"Authorization": f"Bearer {tokens[user_id]}"}
+
+    def draft_owner(draft_id: int) -> dict:
+        return auth((draft_id - 1) % users + 1)
+
+    def login(i):
+        form = {"username": f"user-{i % users}", "password": PASSWORD}
+        return c.post("/api/user/login/", data=form)
+
+    def register(i):
+        user = {
+            "full_name": f"New {i}",
+            "email": f"new-{i}@example.com",
+            "username": f"new-{i}",
+            "password": PASSWORD,
+        }
+        return c.post("/api/user/register/", json=user)
+
+    draft = {"title": "Benchmark draft", "body": BODY}
+    # Update and delete walk disjoint halves of the seeded drafts.
+    half = args.drafts // 2
+    auth_requests, requests, concurrency = (
+        args.auth_requests,
+        args.requests,
+        args.concurrency,
+    )
+    return {
+        "register": (register, auth_requests, 1),
+        "login": (login, auth_requests, 1),
+        "login_concurrent": (login, auth_requests * 2, args.login_concurrency),
+        "blog_list": (
+            lambda i: c.get("/api/blog/", params={"skip": i % 10 * 10}),
+            requests,
+            concurrency,
+        ),
+        "blog_list_deep_offset": (
+            lambda i: c.get("/api/blog/", params={"skip": data["depth"]}),
+            requests,
+            concurrency,
+        ),
+        "blog_list_deep_cursor": (
+            lambda i: c.get("/api/blog/", params={"cursor": data["deep_cursor"]}),
+            requests,
+            concurrency,
+        ),
+        "blog_list_author": (
+            lambda i: c.get("/api/blog/posts/", headers=auth(i % users + 1)),
+            requests,
+            concurrency,
+        ),
+        "blog_detail": (
+            lambda i: c.get(f"/api/blog/post-{i * 7919 % posts}"),
+            requests,
+            concurrency,
+        ),
+        "blog_detail_hot": (
+            lambda i: c.get("/api/blog/post-0"),
+            requests,
+            concurrency,
+        ),
+        "blog_comments_hot": (
+            lambda i: c.get("/api/blog/post-0/comments"),
+            requests,
+            concurrency,
+        ),
+        "draft_create": (
+            lambda i: c.post("/api/draft/", json=draft, headers=auth(i % users + 1)),
+            requests,
+            concurrency,
+        ),
+        "draft_list": (
+            lambda i: c.get("/api/draft/", headers=auth(i % users + 1)),
+            requests,
+            concurrency,
+        ),
+        "draft_detail": (
+            lambda i: c.get(
+                f"/api/draft/{i % args.drafts + 1}",
+                headers=draft_owner(i % args.drafts + 1),
+            ),
+            requests,
+            concurrency,
+        ),
+        "draft_update": (
+            lambda i: c.patch(
+                f"/api/draft/{i % half + 1}",
+                json=draft,
+                headers=draft_owner(i % half + 1),
+            ),
+            requests,
+            concurrency,
+        ),
+        "draft_delete": (
+            lambda i: c.delete(
+                f"/api/draft/{half + i + 1}", headers=draft_owner(half + i + 1)
+            ),
+            min(requests, args.drafts - half),
+            concurrency,
+        ),
+    }
+
+
+def compare(results: dict, baseline_path: str):
+    with open(baseline_path) as f:
+        baseline = json.load(f)["results"]
+    print(f"\nchange vs {baseline_path} (negative latency / positive rps is better)")
+    for name, current in results.items():
+        before = baseline.get(name)
+        if before is None:
+            continue
+        deltas = " ".join(
+            f"{key}={(current[key] - before[key]) / before[key] * 100:+6.1f}%"
+            for key in ("throughput_rps", "p50_ms", "p95_ms", "p99_ms")
+            if before[key]
+        )
+        print(f"{name:>22}: {deltas}")
+
+
+async def run(args):
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        data = await seed(args)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as c:
+            results = {}
+            for name, (send, requests, concurrency) in scenarios(c, args, data).items():
+                if args.only and name not in args.only:
+                    continue
+                results[name] = await drive(send, requests, concurrency)
+                stats = results[name]
+                print(
+                    f"{name:>22}: {stats['throughput_rps']:8.1f} req/s "
+                    f"p50={stats['p50_ms']:8.2f}ms p95={stats['p95_ms']:8.2f}ms "
+                    f"p99={stats['p99_ms']:8.2f}ms errors={stats['errors']}"
+                )
+    report = {
+        "environment": {
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "cpus": os.cpu_count(),
+        },
+        "parameters": {
+            key: getattr(args, key)
+            for key in (
+                "users",
+                "posts",
+                "comments",
+                "drafts",
+                "requests",
+                "auth_requests",
+                "concurrency",
+                "login_concurrency",
+            )
+        },
+        "results": results,
+    }
+    if args.compare:
+        compare(results, args.compare)
+    if args.output:
+        os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--posts", type=int, default=5000)
+    parser.add_argument("--comments", type=int, default=20000)
+    parser.add_argument("--drafts", type=int, default=2000)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--auth-requests", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--login-concurrency", type=int, default=16)
+    parser.add_argument("--output", default=None)
+    parser.add_argument("--compare", default=None)
+    parser.add_argument(
+        "--only", type=lambda value: set(value.split(",")), default=None
+    )
+    asyncio.run(run(parser.parse_args()))
@@ -0,0 +1,33 @@
+import asyncio
+import os
+import sys
+import tempfile
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault(
+    "DATABASE_URL", f"sqlite+aiosqlite:///{tempfile.mkdtemp()}/test.db"
+)
+os.environ.setdefault("SECRET_KEY", "test-secret-key")
+os.environ.setdefault("ALGORITHM", "HS256")
+os.environ.setdefault("ENV_STATE", "test")
+os.environ.setdefault("EMAIL_WORKER_IN_PROCESS", "false")
+os.environ.setdefault("LOG_ASYNC", "false")
+
+
+@pytest.fixture
+def run():
+    """Run a coroutine on a fresh event loop with an up-to-date schema."""
+    from app.config import engine
+    from app.config.schema import ensure_schema
+    from app.main import app  # noqa: F401 - registers every model
+
+    async def scenario(coro):
+        await ensure_schema(engine)
+        try:
+            return await coro
+        finally:
+            await engine.dispose()
+
+    return lambda coro: asyncio.run(scenario(coro))
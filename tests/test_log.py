@@ -0,0 +1,32 @@
+import io
+import logging
+import queue
+from logging.handlers import QueueListener
+
+import orjson
+
+from app.config.log import DeferredQueueHandler, JSONFormatter
+
+
+def test_queued_exception_is_rendered_by_the_listener():
+    log_queue = queue.SimpleQueue()
+    stream = io.StringIO()
+    output = logging.StreamHandler(stream)
+    output.setFormatter(JSONFormatter())
+    listener = QueueListener(log_queue, output)
+    logger = logging.getLogger("tests.log")
+    logger.propagate = False
+    handler = DeferredQueueHandler(log_queue)
+    logger.addHandler(handler)
+    listener.start()
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        logger.exception("failed %s", "job")
+    finally:
+        listener.stop()
+        logger.removeHandler(handler)
+
+    entry = orjson.loads(stream.getvalue())
+    assert entry["message"] == "failed job"
+    assert "ValueError: boom" in entry["exc_info"]
@@ -0,0 +1,150 @@
+import asyncio
+
+from sqlalchemy import delete, insert, select
+
+from app.config.db import async_session
+from app.mail.models import EmailOutbox
+from app.mail.worker import OutboxWorker, SMTPConnectionPool
+
+
+class SMTPStub:
+    """
+    Minimal SMTP server on a free local port.
+    - Accepts every message, or answers 554 to all of them with `reject`.
+    - Counts connections opened and still open.
+    """
+
+    def __init__(self, reject: bool = False):
+        self.reject = reject
+        self.messages: list[bytes] = []
+        self.connections = 0
+        self.open = 0
+
+    async def start(self):
+        self.server = await asyncio.start_server(self.handle, "127.0.0.1", 0)
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.connections += 1
+        self.open += 1
+        writer.write(b"220 stub ready\r\n")
+        try:
+            while line := await reader.readline():
+                command = line[:4].upper()
+                if command == b"DATA":
+                    writer.write(b"354 end with .\r\n")
+                    await writer.drain()
+                    data = b""
+                    while (line := await reader.readline()) not in (b".\r\n", b""):
+                        data += line
+                    if self.reject:
+                        writer.write(b"554 rejected\r\n")
+                    else:
+                        self.messages.append(data)
+                        writer.write(b"250 queued\r\n")
+                elif command == b"QUIT":
+                    writer.write(b"221 bye\r\n")
+                    await writer.drain()
+                    break
+                else:
+                    writer.write(b"250 ok\r\n")
+                await writer.drain()
+        finally:
+            self.open -= 1
+            writer.close()
+
+
+def make_worker(stub: SMTPStub, **options) -> OutboxWorker:
+    pool = SMTPConnectionPool("127.0.0.1", stub.port, use_tls=False, size=2)
+    return OutboxWorker(pool, batch_size=50, backoff=60, **options)
+
+
+async def add_emails(count: int):
+    async with async_session() as session:
+        await session.execute(delete(EmailOutbox))
+        await session.execute(
+            insert(EmailOutbox),
+            [
+                {
+                    "sender": "blog@example.com",
+                    "recipient": f"user{i}@example.com",
+                    "subject": "Hello",
+                    "body": f"message {i}",
+                }
+                for i in range(count)
+            ],
+        )
+        await session.commit()
+
+
+async def outbox() -> list[EmailOutbox]:
+    async with async_session() as session:
+        result = await session.execute(select(EmailOutbox).order_by(EmailOutbox.id))
+        return result.scalars().all()
+
+
+def test_workers_send_each_email_once_over_pooled_connections(run):
+    async def scenario():
+        stub = SMTPStub()
+        await stub.start()
+        await add_emails(20)
+        workers = [make_worker(stub), make_worker(stub)]
+        processed = await asyncio.gather(*(w.process_batch() for w in workers))
+        for worker in workers:
+            await worker.pool.close()
+        await stub.stop()
+        return stub, processed, await outbox()
+
+    stub, processed, emails = run(scenario())
+    assert sum(processed) == 20
+    assert len(stub.messages) == 20
+    assert {email.status for email in emails} == {"sent"}
+    assert stub.connections <= 4
+    assert stub.open == 0
+
+
+def test_failed_send_is_rescheduled_and_its_connection_closed(run):
+    async def scenario():
+        stub = SMTPStub(reject=True)
+        await stub.start()
+        await add_emails(1)
+        worker = make_worker(stub)
+        processed = await worker.process_batch()
+        idle = worker.pool._idle.qsize()
+        await asyncio.sleep(0.1)
+        still_open = stub.open
+        again = await worker.process_batch()
+        await stub.stop()
+        return processed, idle, still_open, again, await outbox()
+
+    processed, idle, still_open, again, emails = run(scenario())
+    assert processed == 1
+    assert idle == 0
+    assert still_open == 0
+    assert again == 0
+    (email,) = emails
+    assert email.status == "pending"
+    assert email.attempts == 1
+    assert "554" in email.last_error
+    assert email.sent_at is None
+
+
+def test_expired_claim_is_taken_again(run):
+    async def scenario():
+        stub = SMTPStub()
+        await stub.start()
+        await add_emails(1)
+        crashed = make_worker(stub, lease=-1)
+        claimed = await crashed.claim()
+        processed = await make_worker(stub).process_batch()
+        await stub.stop()
+        return claimed, processed, await outbox()
+
+    claimed, processed, emails = run(scenario())
+    assert len(claimed) == 1
+    assert processed == 1
+    assert emails[0].status == "sent"
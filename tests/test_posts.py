@@ -0,0 +1,123 @@
+import httpx
+from sqlalchemy import delete, insert
+
+from app.auth.models import User
+from app.auth.utils import JWTRepo
+from app.config.db import async_session
+from app.config.watermark import posts_scope, read_watermark
+from app.main import app
+from app.posts.models import Post
+from app.posts.router import RESERVED_SLUGS, post_router, slugify
+from app.posts.snapshot import front_page
+
+
+async def seed_posts(*titles: str):
+    async with async_session() as session:
+        await session.execute(delete(Post))
+        await session.execute(delete(User))
+        await session.execute(
+            insert(User).values(
+                id=1, full_name="Author", username="author", email="a@example.com"
+            )
+        )
+        await session.execute(
+            insert(Post),
+            [
+                {
+                    "title": title,
+                    "body": f"{title} body",
+                    "slug": slugify(title),
+                    "excerpt": f"{title} body",
+                    "user_id": 1,
+                }
+                for title in titles
+            ],
+        )
+        await session.commit()
+
+
+async def get(path: str, **params) -> httpx.Response:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as c:
+        return await c.get(path, params=params)
+
+
+def test_search_without_terms_matches_nothing(run):
+    async def scenario():
+        await seed_posts("Hello world")
+        return (
+            await get("/api/blog/search", q="   "),
+            await get("/api/blog/search", q=" hello "),
+        )
+
+    blank, hello = run(scenario())
+    assert blank.status_code == 200
+    assert blank.json() == []
+    assert [post["title"] for post in hello.json()] == ["Hello world"]
+
+
+def test_slugs_never_shadowed_by_fixed_routes(run):
+    # Paths a GET /blog/{blog_slug} could also match: one segment, no slash.
+    fixed = {
+        route.path.removeprefix("/blog/")
+        for route in post_router.routes
+        if "GET" in route.methods and "{" not in route.path
+    }
+    fixed = {path for path in fixed if path and "/" not in path}
+    titles = ("Search", "Export", "Most viewed")
+
+    async def scenario():
+        await seed_posts(*titles)
+        return [await get(f"/api/blog/{slugify(title)}") for title in titles]
+
+    assert fixed <= RESERVED_SLUGS
+    assert {slugify(title) for title in titles}.isdisjoint(fixed)
+    for response, title in zip(run(scenario()), titles):
+        assert response.status_code == 200
+        assert response.json()["title"] == title
+
+
+def test_repeated_fields_select_the_column_once():
+    from app.common import select_fields
+
+    columns = select_fields([Post.id], {"body": Post.body}, "body, body,body")
+    assert [column.key for column in columns] == ["id", "body"]
+
+
+def test_list_limit_is_bounded(run):
+    async def scenario():
+        await seed_posts("Bounded")
+        return [
+            await get("/api/blog/", cursor="", limit=limit) for limit in (0, 101, 1)
+        ]
+
+    zero, too_many, one = run(scenario())
+    assert zero.status_code == 422
+    assert too_many.status_code == 422
+    assert one.status_code == 200
+    assert [post["title"] for post in one.json()["items"]] == ["Bounded"]
+
+
+def test_front_page_shows_a_new_post_right_away(run):
+    token = JWTRepo.create_token(1, "access")
+
+    async def scenario():
+        await seed_posts("Older")
+        await front_page.rebuild()
+        before = await get("/api/blog/")
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as c:
+            await c.post(
+                "/api/blog/",
+                json={"title": "Newer", "body": "Newer body"},
+                headers={"Authorization": f"Bearer {token}"},
+            )
+        after = await get("/api/blog/")
+        async with async_session() as session:
+            watermark = await read_watermark(session, posts_scope())
+        return before, after, watermark.headers()["ETag"]
+
+    before, after, etag = run(scenario())
+    assert [post["title"] for post in before.json()] == ["Older"]
+    assert {post["title"] for post in after.json()} == {"Newer", "Older"}
+    assert after.headers["ETag"] == etag != before.headers["ETag"]
@@ -0,0 +1,55 @@
+import itertools
+import tempfile
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from app.auth.models import User
+from app.config import db
+from app.config.schema import ensure_schema
+from app.posts.cache import detail_cache
+from app.posts.models import Post
+from tests.test_posts import get, seed_posts
+
+
+def test_recent_writers_stay_capped(monkeypatch):
+    monkeypatch.setattr(db, "recent_writers", {})
+    monkeypatch.setattr(db, "RECENT_WRITERS_MAX", 100)
+    for i in range(1000):
+        db.mark_write(f"writer-{i}")
+    assert len(db.recent_writers) == 100
+    assert "writer-999" in db.recent_writers
+    assert "writer-0" not in db.recent_writers
+
+
+def test_replica_reads_are_not_cached(run, monkeypatch):
+    replica = db.build_engine(f"sqlite+aiosqlite:///{tempfile.mkdtemp()}/replica.db")
+    replica_session = sessionmaker(replica, class_=AsyncSession)
+    monkeypatch.setattr(db, "read_sessions", [replica_session])
+    monkeypatch.setattr(db, "next_read_session", itertools.cycle([replica_session]))
+
+    async def scenario():
+        await seed_posts("Lagging")
+        await ensure_schema(replica)
+        async with replica_session() as session:
+            await session.execute(
+                insert(User).values(
+                    id=1, full_name="Author", username="author", email="a@example.com"
+                )
+            )
+            # The replica has not caught up with an edit yet.
+            await session.execute(
+                insert(Post).values(
+                    id=1, title="Old title", body="old", slug="lagging", user_id=1
+                )
+            )
+            await session.commit()
+        detail_cache.clear()
+        response = await get("/api/blog/lagging")
+        await replica.dispose()
+        return response
+
+    response = run(scenario())
+    assert response.json()["title"] == "Old title"
+    assert detail_cache.get("lagging") is None
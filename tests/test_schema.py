@@ -0,0 +1,35 @@
+from sqlalchemy import inspect, text, update
+
+from app.config import engine
+from app.config.schema import ensure_schema, schema_version
+
+
+def test_upgrade_adds_indexes_to_existing_tables(run):
+    async def index_names() -> set[str]:
+        async with engine.connect() as conn:
+            return await conn.run_sync(
+                lambda sync: {
+                    index["name"]
+                    for table in ("posts", "drafts", "comments")
+                    for index in inspect(sync).get_indexes(table)
+                }
+            )
+
+    async def scenario():
+        # A database whose tables predate the keyset pagination indexes.
+        async with engine.begin() as conn:
+            for name in ("ix_posts_created_at_id", "ix_drafts_user_id_created_at_id"):
+                await conn.execute(text(f"DROP INDEX {name}"))
+            await conn.execute(update(schema_version).values(version=5))
+        before = await index_names()
+        await ensure_schema(engine)
+        return before, await index_names()
+
+    before, after = run(scenario())
+    assert "ix_posts_created_at_id" not in before
+    assert {
+        "ix_posts_created_at_id",
+        "ix_posts_user_id_created_at_id",
+        "ix_drafts_user_id_created_at_id",
+        "ix_comments_post_id_created_at_id",
+    } <= after
@@ -0,0 +1,30 @@
+import asyncio
+
+from sqlalchemy import select
+
+from app.config.db import async_session
+from app.posts.models import PostStats
+from app.posts.views import ViewCounter
+from tests.test_posts import seed_posts
+
+
+def test_concurrent_flushes_keep_every_viewer(run):
+    async def scenario():
+        await seed_posts("Popular")
+        first = ViewCounter()
+        first.record("popular", "viewer-0")
+        await first.flush()
+        # Two workers flushing at the same time, each with half the viewers.
+        workers = [ViewCounter(), ViewCounter()]
+        for i in range(1000):
+            workers[i % 2].record("popular", f"viewer-{i}")
+        await asyncio.gather(*(worker.flush() for worker in workers))
+        async with async_session() as session:
+            result = await session.execute(
+                select(PostStats.views, PostStats.unique_viewers)
+            )
+            return result.one()
+
+    views, unique_viewers = run(scenario())
+    assert views == 1001
+    assert 900 <= unique_viewers <= 1100